@@ -6,14 +6,21 @@ import importlib
 
 from BlenderGenerator.utils import BlenderUtils
 from BlenderGenerator.utils import marching_cubes
+from BlenderGenerator.utils import jit
+from BlenderGenerator.utils import noise
+from BlenderGenerator.utils import dual_contouring
+from BlenderGenerator.utils import field_cache
 from BlenderGenerator.objects import Torus
+from BlenderGenerator.objects import ParametricSurface
 from BlenderGenerator.objects import tetahedron
 from BlenderGenerator.objects import IsoSurfaceGenerator
+from BlenderGenerator.objects import MengerSpongeGenerator
 
 from BlenderGenerator.scenes import torus
 
 from BlenderGenerator.scenes import tetahedron
 from BlenderGenerator.scenes import isosurface
+from BlenderGenerator.scenes import mengerSponge
 from BlenderGenerator.scenes import Map
 from BlenderGenerator.scenes import platonicSolid
 
@@ -22,6 +29,7 @@ from BlenderGenerator.objects import Materials
 from BlenderGenerator.objects.IsoSurfaceGenerator import *
 
 from BlenderGenerator.objects import PlatonicSolid
+from BlenderGenerator.objects import Terrain
 
 import faulthandler
 import bpy
@@ -49,9 +57,21 @@ class PARAMS_PT_panel(bpy.types.Panel):
         box1.label(text="Marching cube properties")
         box1.prop(context.scene, "grid_size")
         box1.prop(context.scene, "step_size")
+        box1.prop(context.scene, "stream_slabs")
+        # Workers are forked, hidden where fork is unavailable
+        if fork_context is not None:
+            box1.prop(context.scene, "workers")
+        box1.prop(context.scene, "coarse_factor")
+        box1.prop(context.scene, "extractor")
+        box1.prop(context.scene, "adaptive_tolerance")
+        box1.prop(context.scene, "refine_iterations")
+        box1.prop(context.scene, "field_cache_directory")
+        box1.prop(context.scene, "field_cache_size")
         box2 = layout.box()
         box2.label(text="Fractals properties")
         box2.prop(context.scene, "fractals_iteration")
+        box2.prop(context.scene, "tetrahedron_weld")
+        box2.prop(context.scene, "tetrahedron_solid_base")
         box3 = layout.box()
         box3.label(text="Objects properties")
         box3.prop(context.scene, "planet_sphere_radius")
@@ -59,10 +79,17 @@ class PARAMS_PT_panel(bpy.types.Panel):
         box3.prop(context.scene, "mandelbulb_degree")
         box3.prop(context.scene, "torus_fradius")
         box3.prop(context.scene, "torus_sradius")
+        box3.prop(context.scene, "torus_tolerance")
         box3.prop(context.scene, "revolution_height")
         box3.prop(context.scene, "revolution_radius")
         box3.prop(context.scene, "moebius_curve")
         box3.prop(context.scene, "mandelbox_scale")
+        box3.prop(context.scene, "platonic_subdivisions")
+        box3.prop(context.scene, "platonic_sphere")
+        box3.prop(context.scene, "map_resolution")
+        box3.prop(context.scene, "map_chunk_size")
+        box3.prop(context.scene, "map_chunk_resolution")
+        box3.prop(context.scene, "map_view_distance")
 
 
 class OBJECT_OT_mandelbox(bpy.types.Operator):
@@ -179,6 +206,20 @@ class OBJECT_OT_mengersponge(bpy.types.Operator):
         return {'FINISHED'}
 
 
+class OBJECT_OT_mengersponge_mesh(bpy.types.Operator):
+    """
+    Create exact mengersponge fractal menu entry
+    """
+
+    bl_idname = 'object.mengerspongemesh'
+    bl_label = 'Menger Sponge (Exact)'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scenes.mengerSponge.menger_sponge(bpy.context.scene.fractals_iteration)
+        return {'FINISHED'}
+
+
 class OBJECT_OT_heart(bpy.types.Operator):
     """
     Create heart fractal menu entry
@@ -236,6 +277,7 @@ class OBJECT_MT_fractals(bpy.types.Menu):
         layout.operator(OBJECT_OT_mandelbox.bl_idname)
         layout.operator(OBJECT_OT_mandelbulb.bl_idname)
         layout.operator(OBJECT_OT_mengersponge.bl_idname)
+        layout.operator(OBJECT_OT_mengersponge_mesh.bl_idname)
         layout.operator(OBJECT_OT_moebius.bl_idname)
         layout.operator(OBJECT_OT_planet.bl_idname)
         layout.operator(OBJECT_OT_simplenoiseterrain.bl_idname)
@@ -270,7 +312,8 @@ class add_torus(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        scenes.torus.torus(bpy.context.scene.torus_fradius, bpy.context.scene.torus_sradius)
+        scenes.torus.torus(bpy.context.scene.torus_fradius, bpy.context.scene.torus_sradius,
+                           bpy.context.scene.torus_tolerance)
         return {'FINISHED'}
 
 
@@ -285,7 +328,9 @@ class OBJECT_OT_platonic_tetrahedron(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        scenes.platonicSolid.platonic_solid(PlatonicSolid.Shape.TETRAHEDRON)
+        scenes.platonicSolid.platonic_solid(PlatonicSolid.Shape.TETRAHEDRON,
+                                            bpy.context.scene.platonic_subdivisions,
+                                            bpy.context.scene.platonic_sphere)
         return {'FINISHED'}
 
 class OBJECT_OT_platonic_hexahedron(bpy.types.Operator):
@@ -298,7 +343,9 @@ class OBJECT_OT_platonic_hexahedron(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        scenes.platonicSolid.platonic_solid(PlatonicSolid.Shape.HEXAHEDRON)
+        scenes.platonicSolid.platonic_solid(PlatonicSolid.Shape.HEXAHEDRON,
+                                            bpy.context.scene.platonic_subdivisions,
+                                            bpy.context.scene.platonic_sphere)
         return {'FINISHED'}
 
 class OBJECT_OT_platonic_octahedron(bpy.types.Operator):
@@ -311,7 +358,9 @@ class OBJECT_OT_platonic_octahedron(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        scenes.platonicSolid.platonic_solid(PlatonicSolid.Shape.OCTAHEDRON)
+        scenes.platonicSolid.platonic_solid(PlatonicSolid.Shape.OCTAHEDRON,
+                                            bpy.context.scene.platonic_subdivisions,
+                                            bpy.context.scene.platonic_sphere)
         return {'FINISHED'}
 
 class OBJECT_OT_platonic_dodecahedron(bpy.types.Operator):
@@ -324,7 +373,9 @@ class OBJECT_OT_platonic_dodecahedron(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        scenes.platonicSolid.platonic_solid(PlatonicSolid.Shape.DODECAHEDRON)
+        scenes.platonicSolid.platonic_solid(PlatonicSolid.Shape.DODECAHEDRON,
+                                            bpy.context.scene.platonic_subdivisions,
+                                            bpy.context.scene.platonic_sphere)
         return {'FINISHED'}
 
 class OBJECT_OT_platonic_icosahedron(bpy.types.Operator):
@@ -337,7 +388,9 @@ class OBJECT_OT_platonic_icosahedron(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        scenes.platonicSolid.platonic_solid(PlatonicSolid.Shape.ICOSAHEDRON)
+        scenes.platonicSolid.platonic_solid(PlatonicSolid.Shape.ICOSAHEDRON,
+                                            bpy.context.scene.platonic_subdivisions,
+                                            bpy.context.scene.platonic_sphere)
         return {'FINISHED'}
 
 class add_tetrahedron(bpy.types.Operator):
@@ -350,7 +403,38 @@ class add_tetrahedron(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        scenes.tetahedron.fractal_tetrahedron(bpy.context.scene.fractals_iteration)
+        scenes.tetahedron.fractal_tetrahedron(bpy.context.scene.fractals_iteration,
+                                              bpy.context.scene.tetrahedron_weld,
+                                              bpy.context.scene.tetrahedron_solid_base)
+        return {'FINISHED'}
+
+
+class add_map(bpy.types.Operator):
+    """
+    Create noise map terrain menu entry
+    """
+
+    bl_idname = "mesh.map"
+    bl_label = "Map"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scenes.Map.Map(bpy.context.scene.map_resolution)
+        return {'FINISHED'}
+
+
+class add_chunked_map(bpy.types.Operator):
+    """
+    Create or update around the camera the chunked noise map terrain menu entry
+    """
+
+    bl_idname = "mesh.chunked_map"
+    bl_label = "Chunked Map"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scenes.Map.chunked_map(bpy.context.scene.map_chunk_size, bpy.context.scene.map_chunk_resolution,
+                               bpy.context.scene.map_view_distance)
         return {'FINISHED'}
 
 
@@ -360,6 +444,8 @@ def menu_func(self, context):
     """
     self.layout.operator(add_tetrahedron.bl_idname, icon='MOD_SUBSURF')
     self.layout.operator(add_torus.bl_idname, icon='MOD_SUBSURF')
+    self.layout.operator(add_map.bl_idname, icon='MOD_SUBSURF')
+    self.layout.operator(add_chunked_map.bl_idname, icon='MOD_SUBSURF')
     self.layout.menu(OBJECT_MT_fractals.bl_idname, icon='MOD_SUBSURF')
     self.layout.menu(OBJECT_MT_platonic_solids.bl_idname, icon='MOD_SUBSURF')
 
@@ -372,16 +458,44 @@ def register():
     reload_modules_main()
     bpy.types.Scene.step_size = bpy.props.FloatProperty(name="Step Size", precision=4, default=0.5, min=0.0001, max=2.)
     bpy.types.Scene.grid_size = bpy.props.FloatProperty(name="Grid Size", default=3., min=0., max=20.)
+    bpy.types.Scene.stream_slabs = bpy.props.BoolProperty(name="Stream Slabs", default=False)
+    bpy.types.Scene.workers = bpy.props.IntProperty(name="Workers", default=1, min=1, max=64)
+    bpy.types.Scene.coarse_factor = bpy.props.IntProperty(name="Coarse Factor", default=0, min=0, max=64)
+    bpy.types.Scene.extractor = bpy.props.EnumProperty(name="Extractor", default='UNIFORM', items=[
+        ('UNIFORM', "Uniform", "Marching cubes on the whole grid"),
+        ('ADAPTIVE', "Adaptive", "Marching cubes on an octree, with large triangles where the surface is flat"),
+        ('SURFACE_NETS', "Surface Nets", "One vertex per cell and quads, vertices at the mean of the edge crossings"),
+        ('DUAL_CONTOURING', "Dual Contouring", "One vertex per cell and quads, vertices keeping sharp features")])
+    bpy.types.Scene.refine_iterations = bpy.props.IntProperty(name="Refine Iterations", default=0, min=0, max=20)
+    bpy.types.Scene.adaptive_tolerance = bpy.props.FloatProperty(name="Adaptive Tolerance", precision=4,
+                                                                 default=0.01, min=0.0001, max=1.)
+    bpy.types.Scene.field_cache_directory = bpy.props.StringProperty(name="Field Cache", default="",
+                                                                     subtype='DIR_PATH')
+    bpy.types.Scene.field_cache_size = bpy.props.IntProperty(name="Field Cache Size (MB)", default=1024, min=1,
+                                                             max=1048576)
     bpy.types.Scene.fractals_iteration = bpy.props.IntProperty(name="Fractals Iterations", default=5, min=1, max=20)
+    bpy.types.Scene.tetrahedron_weld = bpy.props.BoolProperty(name="Tetrahedron Weld Vertices", default=False)
+    bpy.types.Scene.tetrahedron_solid_base = bpy.props.BoolProperty(name="Tetrahedron Solid Base", default=False)
     bpy.types.Scene.planet_sphere_radius = bpy.props.IntProperty(name="Planet Sphere Radius", default=1, min=0, max=100)
     bpy.types.Scene.heart_stretch_fractor = bpy.props.IntProperty(name="Heart Stretch Factor", default=0, min=0, max=100)
     bpy.types.Scene.mandelbulb_degree = bpy.props.IntProperty(name="Mandelbulb Degree", default=3, min=0, max=10)
     bpy.types.Scene.torus_fradius = bpy.props.FloatProperty(name="Torus First Radius", default=2., min=0., max=100.)
     bpy.types.Scene.torus_sradius = bpy.props.FloatProperty(name="Torus Second Radius", default=1., min=0., max=100.)
+    bpy.types.Scene.torus_tolerance = bpy.props.FloatProperty(name="Torus Tolerance", precision=4, default=0.,
+                                                              min=0., max=1.)
     bpy.types.Scene.revolution_height = bpy.props.FloatProperty(name="Revolution Height", default=2.2, min=0., max=100.)
     bpy.types.Scene.revolution_radius = bpy.props.FloatProperty(name="Revolution Radius", default=3.02, min=0., max=100.)
     bpy.types.Scene.moebius_curve = bpy.props.FloatProperty(name="Moebius Curve", default=0.8, min=0., max=10.)
     bpy.types.Scene.mandelbox_scale = bpy.props.FloatProperty(name="Mandelbox Scale", default=2.5, min=0., max=100.)
+    bpy.types.Scene.platonic_subdivisions = bpy.props.IntProperty(name="Platonic Subdivisions", default=0, min=0,
+                                                                  max=9)
+    bpy.types.Scene.platonic_sphere = bpy.props.BoolProperty(name="Platonic Sphere Projection", default=False)
+    bpy.types.Scene.map_resolution = bpy.props.IntProperty(name="Map Resolution", default=256, min=1, max=4096)
+    bpy.types.Scene.map_chunk_size = bpy.props.FloatProperty(name="Map Chunk Size", default=2., min=0.01, max=100.)
+    bpy.types.Scene.map_chunk_resolution = bpy.props.IntProperty(name="Map Chunk Resolution", default=64, min=1,
+                                                                 max=1024)
+    bpy.types.Scene.map_view_distance = bpy.props.FloatProperty(name="Map View Distance", default=20., min=0.,
+                                                                max=1000.)
 
     bpy.utils.register_class(PARAMS_PT_panel)
 
@@ -392,6 +506,8 @@ def register():
     bpy.utils.register_class(OBJECT_OT_platonic_octahedron)
     bpy.utils.register_class(add_tetrahedron)
     bpy.utils.register_class(add_torus)
+    bpy.utils.register_class(add_map)
+    bpy.utils.register_class(add_chunked_map)
 
     bpy.utils.register_class(OBJECT_OT_mandelbox)
     bpy.utils.register_class(OBJECT_OT_revolution)
@@ -400,6 +516,7 @@ def register():
     bpy.utils.register_class(OBJECT_OT_heart)
     bpy.utils.register_class(OBJECT_OT_mandelbulb)
     bpy.utils.register_class(OBJECT_OT_mengersponge)
+    bpy.utils.register_class(OBJECT_OT_mengersponge_mesh)
     bpy.utils.register_class(OBJECT_OT_planet)
     bpy.utils.register_class(OBJECT_OT_simplenoiseterrain)
     bpy.utils.register_class(OBJECT_OT_torus)
@@ -425,6 +542,8 @@ def unregister():
 
     bpy.utils.unregister_class(add_tetrahedron)
     bpy.utils.unregister_class(add_torus)
+    bpy.utils.unregister_class(add_map)
+    bpy.utils.unregister_class(add_chunked_map)
 
     bpy.utils.unregister_class(OBJECT_OT_mandelbox)
     bpy.utils.unregister_class(OBJECT_OT_revolution)
@@ -433,6 +552,7 @@ def unregister():
     bpy.utils.unregister_class(OBJECT_OT_heart)
     bpy.utils.unregister_class(OBJECT_OT_mandelbulb)
     bpy.utils.unregister_class(OBJECT_OT_mengersponge)
+    bpy.utils.unregister_class(OBJECT_OT_mengersponge_mesh)
     bpy.utils.unregister_class(OBJECT_OT_planet)
     bpy.utils.unregister_class(OBJECT_OT_simplenoiseterrain)
     bpy.utils.unregister_class(OBJECT_OT_torus)
@@ -448,15 +568,23 @@ def reload_modules_main():
     """
 
     importlib.reload(utils.BlenderUtils)
+    importlib.reload(utils.jit)
     importlib.reload(utils.marching_cubes)
+    importlib.reload(utils.noise)
+    importlib.reload(utils.dual_contouring)
+    importlib.reload(utils.field_cache)
     importlib.reload(objects.Torus)
+    importlib.reload(objects.ParametricSurface)
     importlib.reload(objects.tetahedron)
     importlib.reload(objects.IsoSurfaceGenerator)
+    importlib.reload(objects.MengerSpongeGenerator)
     importlib.reload(objects.Materials)
     importlib.reload(objects.PlatonicSolid)
+    importlib.reload(objects.Terrain)
     importlib.reload(scenes.torus)
     importlib.reload(scenes.tetahedron)
     importlib.reload(scenes.isosurface)
+    importlib.reload(scenes.mengerSponge)
     importlib.reload(scenes.Map)
     importlib.reload(scenes.platonicSolid)
 
@@ -4,18 +4,26 @@ Called when manually import script in Blender Console
 
 import importlib
 import utils.BlenderUtils
+import utils.jit
 import utils.marching_cubes
+import utils.noise
+import utils.dual_contouring
+import utils.field_cache
 import objects.Torus
+import objects.ParametricSurface
 import objects.tetahedron
 import objects.IsoSurfaceGenerator
+import objects.MengerSpongeGenerator
 import scenes.torus
 import scenes.tetahedron
 import scenes.isosurface
+import scenes.mengerSponge
 import scenes.Map
 import scenes.platonicSolid
 import objects.Materials
 from objects.IsoSurfaceGenerator import *
 import objects.PlatonicSolid
+import objects.Terrain
 import faulthandler
 import bpy
 
@@ -133,6 +141,19 @@ class OBJECT_OT_mengersponge(bpy.types.Operator):
         scenes.isosurface.isosurface(MengerSponge())
         return {'FINISHED'}
 
+class OBJECT_OT_mengersponge_mesh(bpy.types.Operator):
+    """
+    Create exact mengersponge fractal menu entry
+    """
+
+    bl_idname = 'object.mengerspongemesh'
+    bl_label = 'Menger Sponge (Exact)'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scenes.mengerSponge.menger_sponge()
+        return {'FINISHED'}
+
 class OBJECT_OT_heart(bpy.types.Operator):
     """
     Create heart fractal menu entry
@@ -189,6 +210,7 @@ class OBJECT_MT_fractals(bpy.types.Menu):
         layout.operator(OBJECT_OT_mandelbox.bl_idname)
         layout.operator(OBJECT_OT_mandelbulb.bl_idname)
         layout.operator(OBJECT_OT_mengersponge.bl_idname)
+        layout.operator(OBJECT_OT_mengersponge_mesh.bl_idname)
         layout.operator(OBJECT_OT_moebius.bl_idname)
         layout.operator(OBJECT_OT_planet.bl_idname)
         layout.operator(OBJECT_OT_simplenoiseterrain.bl_idname)
@@ -255,6 +277,7 @@ def register():
     bpy.utils.register_class(OBJECT_OT_heart)
     bpy.utils.register_class(OBJECT_OT_mandelbulb)
     bpy.utils.register_class(OBJECT_OT_mengersponge)
+    bpy.utils.register_class(OBJECT_OT_mengersponge_mesh)
     bpy.utils.register_class(OBJECT_OT_planet)
     bpy.utils.register_class(OBJECT_OT_simplenoiseterrain)
     bpy.utils.register_class(OBJECT_OT_torus)
@@ -278,6 +301,7 @@ def unregister():
     bpy.utils.unregister_class(OBJECT_OT_heart)
     bpy.utils.unregister_class(OBJECT_OT_mandelbulb)
     bpy.utils.unregister_class(OBJECT_OT_mengersponge)
+    bpy.utils.unregister_class(OBJECT_OT_mengersponge_mesh)
     bpy.utils.unregister_class(OBJECT_OT_planet)
     bpy.utils.unregister_class(OBJECT_OT_simplenoiseterrain)
     bpy.utils.unregister_class(OBJECT_OT_torus)
@@ -292,15 +316,23 @@ def reload_modules_main():
     """
 
     importlib.reload(utils.BlenderUtils)
+    importlib.reload(utils.jit)
     importlib.reload(utils.marching_cubes)
+    importlib.reload(utils.noise)
+    importlib.reload(utils.dual_contouring)
+    importlib.reload(utils.field_cache)
     importlib.reload(objects.Torus)
+    importlib.reload(objects.ParametricSurface)
     importlib.reload(objects.tetahedron)
     importlib.reload(objects.IsoSurfaceGenerator)
+    importlib.reload(objects.MengerSpongeGenerator)
     importlib.reload(objects.Materials)
     importlib.reload(objects.PlatonicSolid)
+    importlib.reload(objects.Terrain)
     importlib.reload(scenes.torus)
     importlib.reload(scenes.tetahedron)
     importlib.reload(scenes.isosurface)
+    importlib.reload(scenes.mengerSponge)
     importlib.reload(scenes.Map)
     importlib.reload(scenes.platonicSolid)
 
@@ -4,10 +4,29 @@ import math
 
 # import utils.marching_cubes
 from BlenderGenerator.utils import marching_cubes
+from BlenderGenerator.utils import noise
+from BlenderGenerator.utils import dual_contouring
+from BlenderGenerator.utils import jit
 
+import multiprocessing
 import numpy
+import sys
+import weakref
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python < 3.8
+    shared_memory = None
+
+# The workers use the add-on modules, which import bpy, they can only be forked from Blender. Fork is not
+# available on Windows and not safe on macOS.
+fork_context = None
+if 'fork' in multiprocessing.get_all_start_methods() and sys.platform != 'darwin':
+    fork_context = multiprocessing.get_context('fork')
 
 # import objects.Materials
 from BlenderGenerator.objects import Materials
@@ -17,6 +36,25 @@ def clamp(n, smallest, largest):
     return max(smallest, min(n, largest))
 
 
+def complex_power(real, imag, degree):
+    """
+    Raise complex numbers to a positive integer power by squaring, works on floats and arrays
+    :param real: The real parts
+    :param imag: The imaginary parts
+    :param degree: The power
+    :return: The real and imaginary parts of the power
+    """
+    result = None
+    while degree:
+        if degree & 1:
+            result = (real, imag) if result is None else \
+                (result[0] * real - result[1] * imag, result[0] * imag + result[1] * real)
+        degree >>= 1
+        if degree:
+            real, imag = real * real - imag * imag, 2. * real * imag
+    return result if result is not None else (real * 0. + 1., imag * 0.)
+
+
 class IsoSurface(ABC):
     """
     Describe a basic isosurface
@@ -37,6 +75,48 @@ class IsoSurface(ABC):
         """
         pass
 
+    def test_points(self, points):
+        """
+        Test the distance of several points to the IsoSurface
+        :param points: Array of shape (n, 3) of the points we want to test
+        :return: Array of shape (n,) of the distances between the points and the isosurface
+        """
+        return numpy.array([self.test_point(mathutils.Vector(point)) for point in points], dtype=numpy.float64)
+
+    def gradients(self, points):
+        """
+        Compute the field gradient of several points, by central differences of test_points unless the
+        surface knows its derivatives
+        :param points: Array of shape (n, 3) of the points
+        :return: Array of shape (n, 3) of the gradients
+        """
+        points = numpy.asarray(points, dtype=numpy.float64)
+        epsilon = 1e-5
+        offsets = numpy.eye(3) * epsilon
+        shifted = numpy.concatenate([points + offset for offset in offsets] +
+                                    [points - offset for offset in offsets])
+        values = self.test_points(shifted).reshape(6, len(points))
+        return (values[:3] - values[3:]).T / (2 * epsilon)
+
+    def narrow_band_margin(self, block_size, value_range):
+        """
+        Safety margin of the coarse to fine evaluation. A coarse block is refined when the isovalue is
+        within the range of its corner values widened on both sides by the margin.
+        :param block_size: Edge length of the coarse blocks
+        :param value_range: Array of the range of the corner values of each block
+        :return: The margin, in field units
+        """
+        return value_range * 0.5
+
+    def signature(self):
+        """
+        Describe the surface and its parameters, two surfaces with the same signature have the same field
+        :return: Tuple of the class name and of the sorted (attribute, value) pairs
+        """
+        parameters = tuple((name, value.signature() if isinstance(value, IsoSurface) else value)
+                           for name, value in sorted(vars(self).items()))
+        return type(self).__qualname__, parameters
+
     @abstractmethod
     def material(self):
         pass
@@ -54,8 +134,14 @@ class Planet(IsoSurface):
         return 0.
 
     def test_point(self, point):
-        return self.__sphere.test_point(point) + \
-               mathutils.noise.hybrid_multi_fractal(point.normalized(), 1., 10.0, 12, 1, 50) * (self.__radius/3)
+        return self.test_points(numpy.array([[point.x, point.y, point.z]]))[0]
+
+    def test_points(self, points):
+        points = numpy.asarray(points, dtype=numpy.float64)
+        length = numpy.linalg.norm(points, axis=1)[:, None]
+        normalized = numpy.divide(points, length, out=numpy.zeros_like(points), where=length > 0.)
+        return self.__sphere.test_points(points) + \
+            noise.hybrid_multi_fractal(normalized, 1., 10.0, 12, 1, 50) * (self.__radius/3)
 
     def material(self):
         return Materials.SmoothColor((1., 1., 1., 1.))
@@ -70,7 +156,12 @@ class SimpleNoiseTerrain(IsoSurface):
         return 0.
 
     def test_point(self, point):
-        return mathutils.noise.noise(point.xyz, noise_basis='PERLIN_ORIGINAL') - point.z
+        return self.test_points(numpy.array([[point.x, point.y, point.z]]))[0]
+
+    def test_points(self, points):
+        points = numpy.asarray(points, dtype=numpy.float64)
+        # Signed like mathutils.noise.noise, between -1 and 1
+        return noise.perlin_noise(points) - points[:, 2]
 
     def material(self):
         return Materials.HeightMapColor()
@@ -93,6 +184,19 @@ class Heart(IsoSurface):
         cube = (x * x + 9./4. * y * y + z * z - 1)
         return cube * cube * cube - x * x * z * z * z - (9. * y * y * z * z * z)/200. * self.__stretch
 
+    def test_points(self, points):
+        x, y, z = numpy.asarray(points, dtype=numpy.float64).T
+        cube = (x * x + 9./4. * y * y + z * z - 1)
+        return cube * cube * cube - x * x * z * z * z - (9. * y * y * z * z * z)/200. * self.__stretch
+
+    def gradients(self, points):
+        x, y, z = numpy.asarray(points, dtype=numpy.float64).T
+        cube = (x * x + 9./4. * y * y + z * z - 1)
+        return numpy.stack((6 * cube * cube * x - 2 * x * z * z * z,
+                            27./2. * cube * cube * y - (18. * y * z * z * z)/200. * self.__stretch,
+                            6 * cube * cube * z - 3 * x * x * z * z - (27. * y * y * z * z)/200. * self.__stretch),
+                           axis=1)
+
     def material(self):
         return Materials.SmoothColor(color=(1., 0., 0., 0.))
 
@@ -108,6 +212,10 @@ class MengerSponge(IsoSurface):
     def isovalue(self):
         return 0.0
 
+    def narrow_band_margin(self, block_size, value_range):
+        # The field is a distance bound, it cannot change more than the block diagonal
+        return block_size * math.sqrt(3)
+
     def __test_point_box(self, point, b):
         d = mathutils.Vector((math.fabs(point.x) - b.x,
                                math.fabs(point.y) - b.y,
@@ -153,6 +261,35 @@ class MengerSponge(IsoSurface):
             menger = max(max(max(menger, -hole_x), -hole_y), -hole_z)
         return menger
 
+    @staticmethod
+    def __test_points_box(points, b):
+        d = numpy.abs(points) - b
+        return numpy.minimum(d.max(axis=1), 0.) + numpy.linalg.norm(numpy.maximum(d, 0.), axis=1)
+
+    def test_points(self, points):
+        if jit.available:
+            return jit.menger_sponge(numpy.ascontiguousarray(points, dtype=numpy.float64), self.__iterations)
+
+        points = numpy.asarray(points, dtype=numpy.float64)
+        main_width_box = 2.
+        inf = 1.
+        hole_width_b = main_width_box / 3.0
+
+        menger = self.__test_points_box(points, numpy.array([main_width_box, main_width_box, main_width_box]))
+        for i in range(0, self.__iterations):
+            hole_distance = hole_width_b * 6.
+
+            s = points + hole_width_b
+            q = s - hole_distance * numpy.floor(s / hole_distance) - hole_width_b
+
+            hole_x = self.__test_points_box(q, numpy.array([inf, hole_width_b, hole_width_b]))
+            hole_y = self.__test_points_box(q, numpy.array([hole_width_b, inf, hole_width_b]))
+            hole_z = self.__test_points_box(q, numpy.array([hole_width_b, hole_width_b, inf]))
+
+            hole_width_b = hole_width_b / 3.0
+            menger = numpy.maximum(numpy.maximum(numpy.maximum(menger, -hole_x), -hole_y), -hole_z)
+        return menger
+
     def material(self):
         return Materials.SmoothColor(color=(0.1, 0.1, 0.1, 0.))
 
@@ -162,14 +299,44 @@ class Mandelbulb(IsoSurface):
     Based on https://www.fountainware.com/Funware/Mandelbrot3D/Mandelbrot3d.htm
     Isovalue of a Mandelbulb
     """
-    def __init__(self, max_iterations=5, degree=3):
+    def __init__(self, max_iterations=5, degree=3, margin=1.):
         self.__max_iterations = max_iterations
         self.__degree = degree
+        self.__margin = margin
 
     def isovalue(self):
         return 1.
 
+    def narrow_band_margin(self, block_size, value_range):
+        # Escape values are not bounded between the coarse points, the default margin is found by
+        # comparing with full resolution meshes, math.inf refines everything
+        return self.__margin
+
+    def __integer_degree(self):
+        """
+        Integer degrees use the triplex algebra, r^n (sin(n theta) cos(n phi), sin(n theta) sin(n phi),
+        cos(n theta)) is the complex power of (z + i rho) for the polar angle times the complex power of
+        (x + i y) / rho for the azimuth
+        """
+        return float(self.__degree).is_integer() and self.__degree >= 0
+
     def test_point(self, point):
+        if self.__integer_degree():
+            degree = int(self.__degree)
+            x, y, z = point.x, point.y, point.z
+            result = 0
+            for ite in range(0, self.__max_iterations):
+                rho = math.sqrt(x * x + y * y)
+                polar_real, polar_imag = complex_power(z, rho, degree)
+                azimuth_real, azimuth_imag = complex_power(x / rho, y / rho, degree) if rho > 0. else (1., 0.)
+                x, y, z = polar_imag * azimuth_real + x, polar_imag * azimuth_imag + y, polar_real + z
+
+                result = math.sqrt(x * x + y * y + z * z)
+                if result > 1:
+                    return result
+
+            return result
+
         c = point
         result = 0
         for ite in range(0, self.__max_iterations):
@@ -190,6 +357,53 @@ class Mandelbulb(IsoSurface):
 
         return result
 
+    def test_points(self, points):
+        if jit.available:
+            points = numpy.ascontiguousarray(points, dtype=numpy.float64)
+            if self.__integer_degree():
+                return jit.mandelbulb_triplex(points, self.__max_iterations, int(self.__degree))
+            return jit.mandelbulb(points, self.__max_iterations, float(self.__degree))
+
+        c = numpy.array(points, dtype=numpy.float64)
+        result = numpy.zeros(len(c))
+        # Points which have not escaped yet, only them are iterated
+        active = numpy.arange(len(c))
+        with numpy.errstate(over='ignore', invalid='ignore'):
+            for ite in range(0, self.__max_iterations):
+                if not len(active):
+                    break
+                x, y, z = c.T
+                if self.__integer_degree():
+                    rho = numpy.sqrt(x * x + y * y)
+                    polar_real, polar_imag = complex_power(z, rho, int(self.__degree))
+                    # The azimuth of the points on the z axis is 0
+                    axial = rho == 0.
+                    length = numpy.where(axial, 1., rho)
+                    azimuth_real, azimuth_imag = complex_power(numpy.where(axial, 1., x / length),
+                                                               numpy.where(axial, 0., y / length),
+                                                               int(self.__degree))
+                    nv = numpy.stack(numpy.broadcast_arrays(polar_imag * azimuth_real, polar_imag * azimuth_imag,
+                                                            polar_real), axis=1)
+                else:
+                    r = numpy.sqrt(x * x + y * y + z * z)
+                    theta = numpy.arctan2(numpy.sqrt(x * x + y * y), z)
+                    phi = numpy.arctan2(y, x)
+                    p = numpy.power(r, self.__degree)
+                    nv = numpy.stack((
+                        p * numpy.sin(theta * self.__degree) * numpy.cos(phi * self.__degree),
+                        p * numpy.sin(theta * self.__degree) * numpy.sin(phi * self.__degree),
+                        p * numpy.cos(theta * self.__degree)
+                    ), axis=1)
+
+                # Escaped points keep their last value
+                c = nv + c
+                result[active] = numpy.linalg.norm(c, axis=1)
+                remaining = result[active] <= 1
+                active = active[remaining]
+                c = c[remaining]
+
+        return result
+
     def material(self):
         return Materials.SmoothColor(color=(0.1, 0.1, 0.1, 0.))
 
@@ -207,6 +421,13 @@ class Sphere(IsoSurface):
     def test_point(self, point):
         return point.length_squared - self.__radius
 
+    def test_points(self, points):
+        points = numpy.asarray(points, dtype=numpy.float64)
+        return numpy.einsum('ij,ij->i', points, points) - self.__radius
+
+    def gradients(self, points):
+        return 2 * numpy.asarray(points, dtype=numpy.float64)
+
     def material(self):
         return Materials.SmoothColor(color=(1., 1., 1., 1.))
 
@@ -233,6 +454,17 @@ class Torus(IsoSurface):
                (self.__fradius * self.__fradius) *\
                (point.x * point.x + point.y * point.y)
 
+    def test_points(self, points):
+        x, y, z = numpy.asarray(points, dtype=numpy.float64).T
+        power = x * x + y * y + z * z + self.__fradius * self.__fradius - self.__sradius * self.__sradius
+        return power * power - 4 * (self.__fradius * self.__fradius) * (x * x + y * y)
+
+    def gradients(self, points):
+        x, y, z = numpy.asarray(points, dtype=numpy.float64).T
+        power = x * x + y * y + z * z + self.__fradius * self.__fradius - self.__sradius * self.__sradius
+        planar = 4 * (power - 2 * self.__fradius * self.__fradius)
+        return numpy.stack((planar * x, planar * y, 4 * power * z), axis=1)
+
     def material(self):
         return Materials.SmoothColor(color=(1., 1., 1., 1.))
 
@@ -250,6 +482,17 @@ class Genus2(IsoSurface):
                (point.x * point.x + point.y * point.y) - (9 * point.z * point.z - 1) * \
                (1 - point.z * point.z)
 
+    def test_points(self, points):
+        x, y, z = numpy.asarray(points, dtype=numpy.float64).T
+        return 2 * y * (y * y - 3 * x * x) * (1 - z * z) + (x * x + y * y) * (x * x + y * y) - \
+            (9 * z * z - 1) * (1 - z * z)
+
+    def gradients(self, points):
+        x, y, z = numpy.asarray(points, dtype=numpy.float64).T
+        return numpy.stack((4 * x * (x * x + y * y) - 12 * x * y * (1 - z * z),
+                            6 * (y * y - x * x) * (1 - z * z) + 4 * y * (x * x + y * y),
+                            36 * z * z * z - 20 * z - 4 * z * y * (y * y - 3 * x * x)), axis=1)
+
     def material(self):
         return Materials.SmoothColor(color=(1., 1., 1., 1.))
 
@@ -269,6 +512,18 @@ class RevolutionSurface(IsoSurface):
         ln_z = (numpy.log(point.z + self.__height))
         return point.x * point.x + point.y * point.y - (ln_z * ln_z) - self.__radius
 
+    def test_points(self, points):
+        x, y, z = numpy.asarray(points, dtype=numpy.float64).T
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            ln_z = numpy.log(z + self.__height)
+        return x * x + y * y - (ln_z * ln_z) - self.__radius
+
+    def gradients(self, points):
+        x, y, z = numpy.asarray(points, dtype=numpy.float64).T
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            ln_z = numpy.log(z + self.__height)
+            return numpy.stack((2 * x, 2 * y, -2 * ln_z / (z + self.__height)), axis=1)
+
     def material(self):
         return Materials.SmoothColor(color=(1., 1., 1., 1.))
 
@@ -288,6 +543,17 @@ class Moebius(IsoSurface):
                point.y * point.y * point.y - point.y - self.__curve * point.x * point.z \
                - self.__curve * point.x * point.x * point.z - self.__curve * point.y * point.y * point.z
 
+    def test_points(self, points):
+        x, y, z = numpy.asarray(points, dtype=numpy.float64).T
+        return x * x * y + y * z * z + y * y * y - y - self.__curve * x * z \
+            - self.__curve * x * x * z - self.__curve * y * y * z
+
+    def gradients(self, points):
+        x, y, z = numpy.asarray(points, dtype=numpy.float64).T
+        return numpy.stack((2 * x * y - self.__curve * z - 2 * self.__curve * x * z,
+                            x * x + z * z + 3 * y * y - 1 - 2 * self.__curve * y * z,
+                            2 * y * z - self.__curve * x - self.__curve * x * x - self.__curve * y * y), axis=1)
+
     def material(self):
         return Materials.SmoothColor(color=(1., 1., 1., 1.))
 
@@ -303,6 +569,10 @@ class Mandelbox(IsoSurface):
     def isovalue(self):
         return 1.
 
+    def narrow_band_margin(self, block_size, value_range):
+        # The distance estimation is not bounded between the coarse points, refine everything to stay exact
+        return math.inf
+
     def test_point(self, point):
         x = point.x
         y = point.y
@@ -348,6 +618,44 @@ class Mandelbox(IsoSurface):
         distance = math.sqrt(x * x + y * y + z * z) / math.fabs(de_factor)
         return distance
 
+    def test_points(self, points):
+        if jit.available:
+            return jit.mandelbox(numpy.ascontiguousarray(points, dtype=numpy.float64), float(self.__scale),
+                                 self.__iterations)
+
+        x, y, z = numpy.array(points, dtype=numpy.float64).T
+        fixed_radius = 1.0
+        fr2 = fixed_radius * fixed_radius
+        min_radius = 0.5
+        mr2 = min_radius * min_radius
+
+        # The folds never let a point escape, every point runs every iteration. The derivative factor is
+        # reset at each iteration, only the one of the last iteration is kept.
+        de_factor = numpy.full(len(x), float(self.__scale))
+        for i in range(0, self.__iterations):
+            # Box fold, 2 * x - x is exactly x inside the box
+            x = numpy.clip(x, -1.0, 1.0) * 2.0 - x
+            y = numpy.clip(y, -1.0, 1.0) * 2.0 - y
+            z = numpy.clip(z, -1.0, 1.0) * 2.0 - z
+
+            # Sphere fold, only on the points inside the fixed radius
+            r2 = x*x + y*y + z*z
+            folded = numpy.flatnonzero(r2 < fr2)
+            divisor = numpy.maximum(r2[folded], mr2)
+            x[folded] = x[folded] * fr2 / divisor
+            y[folded] = y[folded] * fr2 / divisor
+            z[folded] = z[folded] * fr2 / divisor
+
+            x = x * self.__scale + 2
+            y = y * self.__scale + -2
+            z = z * self.__scale + -2
+
+            if i == self.__iterations - 1:
+                de_factor[folded] = de_factor[folded] * fr2 / divisor
+                de_factor = de_factor * self.__scale
+
+        return numpy.sqrt(x * x + y * y + z * z) / numpy.abs(de_factor)
+
     def material(self):
         return Materials.SmoothColor(color=(1., 1., 1., 1.))
 
@@ -355,59 +663,459 @@ class Mandelbox(IsoSurface):
 
 
 
+def _sample_slices(isosurface, field, low, step, start, stop):
+    """
+    Evaluate the field of the grid x slices [start, stop)
+    :param isosurface: The isosurface
+    :param field: The field buffer of the whole grid
+    :param low: The coordinate of the first grid point on each axis
+    :param step: The step size of the grid
+    :param start: First x slice
+    :param stop: Last x slice (excluded)
+    """
+    count = field.shape[0]
+    axis = low + numpy.arange(count) * step
+
+    # Points of a slice, only their x coordinate changes from one slice to the next
+    points = numpy.empty((count, count, 3))
+    points[..., 1], points[..., 2] = numpy.meshgrid(axis, axis, indexing='ij')
+    points = points.reshape(-1, 3)
+
+    for i in range(start, stop):
+        points[:, 0] = axis[i]
+        field[i] = isosurface.test_points(points).reshape(count, count)
+
+
+def _sample_block(memory_name, count, isosurface, low, step, start, stop):
+    """
+    Evaluate a block of x slices in a worker process, directly into the shared field buffer
+    :param memory_name: Name of the shared memory of the field buffer
+    :param count: The number of grid points per axis
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        field = numpy.ndarray((count, count, count), dtype=numpy.float64, buffer=memory.buf)
+        _sample_slices(isosurface, field, low, step, start, stop)
+        del field
+    finally:
+        memory.close()
+
+
+def _sample_indices(isosurface, field, low, step, indices):
+    """
+    Evaluate the field of some grid points by batches of one slice
+    :param isosurface: The isosurface
+    :param field: The field buffer of the whole grid
+    :param low: The coordinate of the first grid point on each axis
+    :param step: The step size of the grid
+    :param indices: Array of the flat indices of the grid points in the field buffer
+    """
+    batch = field.shape[1] * field.shape[2]
+    for start in range(0, len(indices), batch):
+        grid_points = numpy.stack(numpy.unravel_index(indices[start:start + batch], field.shape), axis=1)
+        field.ravel()[indices[start:start + batch]] = isosurface.test_points(low + grid_points * step)
+
+
+def _sample_index_block(memory_name, count, isosurface, low, step, indices):
+    """
+    Evaluate some grid points in a worker process, directly into the shared field buffer
+    :param memory_name: Name of the shared memory of the field buffer
+    :param count: The number of grid points per axis
+    """
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        field = numpy.ndarray((count, count, count), dtype=numpy.float64, buffer=memory.buf)
+        _sample_indices(isosurface, field, low, step, indices)
+        del field
+    finally:
+        memory.close()
+
+
+def _lattice_matches(low, step, count, known_low, known_step, known_count):
+    """
+    Match the points of a grid axis with the points of the axis of a previously sampled grid
+    :param low: The coordinate of the first grid point
+    :param step: The step size of the grid
+    :param count: The number of grid points
+    :param known_low: The coordinate of the first point of the sampled grid
+    :param known_step: The step size of the sampled grid
+    :param known_count: The number of points of the sampled grid
+    :return: Indices of the matched points in the axis and in the sampled axis
+    """
+    position = (low + numpy.arange(count) * step - known_low) / known_step
+    index = numpy.rint(position)
+    matched = (numpy.abs(position - index) < 1e-6) & (index >= 0) & (index < known_count)
+    return numpy.flatnonzero(matched), index[matched].astype(numpy.int64)
+
+
+def _release_shared_memory(memory):
+    memory.close()
+    memory.unlink()
+
+
 class IsoSurfaceGenerator:
     """
     Class which aims to create an isosurface mesh based on a isofunction and the Marching cubes algorithm
     """
-    def __init__(self, isosurface=Mandelbox(), grid_size=4, step_size=0.05):
+    def __init__(self, isosurface=Mandelbox(), grid_size=4, step_size=0.05, workers=1, coarse_factor=0,
+                 extractor='uniform', tolerance=0.01, levels=4, refine_iterations=0, cache=None):
         """
 
         :param isosurface: The isosurface type
         :param grid_size: The drid_size of the marching cubes
         :param step_size: The step size in the grid of the marching cubes
+        :param workers: Number of processes evaluating the field
+        :param coarse_factor: Number of steps per block of the coarse grid used to skip the empty space,
+        0 to evaluate every grid point
+        :param extractor: 'uniform' for marching cubes on the whole grid, 'adaptive' for marching cubes
+        on an octree whose smallest cells have the step size, 'surface_nets' or 'dual_contouring' for quads
+        with one vertex per cell
+        :param tolerance: Largest distance between the adaptive mesh and the isosurface
+        :param levels: Number of times the octree root cells can be split
+        :param refine_iterations: Number of field evaluations moving each vertex closer to the isosurface,
+        0 to keep the linear interpolation
+        :param cache: The FieldCache storing the sampled grids on disk, None to always evaluate the field
         """
         self.__isosurface = isosurface
         self.__grid_size = grid_size
         self.__step_size = step_size
+        self.__workers = workers if shared_memory is not None and fork_context is not None else 1
+        self.__coarse_factor = coarse_factor
+        self.__extractor = extractor
+        self.__tolerance = tolerance
+        self.__levels = levels
+        self.__refine_iterations = refine_iterations
+        self.__cache = cache
 
         self.__vertices = []
         self.__faces = []
+        self.__normals = []
+
+        # Field values of the grid points, reused between generations
+        self.__field = None
+        self.__field_memory = None
+        self.__evaluations = 0
 
-    def generate_mesh(self):
+        # Field buffer, first grid point and step size of the last grid sampled at every point
+        self.__known = None
+
+    def __evaluate(self, points):
         """
-        Build mesh using marching cubes
+        Evaluate the field of points outside of the grid sampling, counting the evaluations
+        :param points: Array of shape (n, 3) of the points
+        :return: Array of shape (n,) of the field values
         """
+        self.__evaluations += len(points)
+        return self.__isosurface.test_points(points)
 
-        # Compute grid bounds
+    def __lattice(self):
+        """
+        Compute the lattice of the grid
+        :return: The coordinate of the first grid point on each axis and the number of points per axis
+        """
         low = -(self.__grid_size / 2) - self.__step_size
         up = (self.__grid_size / 2) + self.__step_size
-        self.__faces = []
+        return low, len(numpy.arange(low, up, self.__step_size)) + 1
 
-        # Grid building
-        for i in numpy.arange(low, up, self.__step_size):
-            for j in numpy.arange(low, up, self.__step_size):
-                for k in numpy.arange(low, up, self.__step_size):
+    def __allocate_field(self, count, shared=True):
+        """
+        Allocate the field buffer, in shared memory when several processes evaluate the field
+        :param count: The number of grid points per axis
+        :param shared: Allow the shared memory, False when only this process evaluates the field
+        """
+        shape = (count, count, count)
+        shared = shared and self.__workers > 1
+        if self.__field is not None and self.__field.shape == shape and self.__field.flags.writeable and \
+                shared == (self.__field_memory is not None):
+            return
+
+        self.__release_field()
+        if shared:
+            self.__field_memory = shared_memory.SharedMemory(create=True, size=count * count * count * 8)
+            self.__field = numpy.ndarray(shape, dtype=numpy.float64, buffer=self.__field_memory.buf)
+            # The views of the field keep it alive, the shared memory is released with the last of them
+            weakref.finalize(self.__field, _release_shared_memory, self.__field_memory)
+        else:
+            self.__field = numpy.empty(shape)
+
+    def __release_field(self):
+        self.__field = None
+        self.__known = None
+        self.__field_memory = None
+
+    def __sample_field(self, low, count):
+        """
+        Evaluate the field once per grid point into the field buffer
+        :param low: The coordinate of the first grid point on each axis
+        :param count: The number of grid points per axis
+        :return: The field buffer
+        """
+        key = None
+        if self.__cache is not None:
+            key = self.__cache.key(self.__isosurface.signature(), low, self.__step_size, count,
+                                  'numba' if jit.available else 'numpy')
+            field = self.__cache.load(key)
+            if field is not None and field.shape == (count, count, count):
+                self.__release_field()
+                self.__field = field
+                self.__known = field, low, self.__step_size
+                return field
+
+        reused = None
+        if self.__known is not None:
+            known_field, known_low, known_step = self.__known
+            axis, known_axis = _lattice_matches(low, self.__step_size, count, known_low, known_step,
+                                                known_field.shape[0])
+            if len(axis):
+                reused = axis, known_field, known_axis
+            known_field = None
+        self.__known = None
+
+        # The known values are read from the old buffer, a new one is allocated instead of overwriting it
+        if reused is not None and reused[1] is self.__field:
+            self.__release_field()
+        self.__allocate_field(count)
+
+        if reused is not None:
+            # Copied one slice at a time, the old buffer is released right after
+            axis, known_field, known_axis = reused
+            reused = None
+            for index, known_index in zip(axis, known_axis):
+                self.__field[index][numpy.ix_(axis, axis)] = known_field[known_index][numpy.ix_(known_axis, known_axis)]
+            known_field = None
+
+            missing = numpy.ones((count, count, count), dtype=bool)
+            missing[numpy.ix_(axis, axis, axis)] = False
+            indices = numpy.flatnonzero(missing)
+            self.__sample_missing(low, count, indices)
+            self.__evaluations += len(indices)
+        elif self.__field_memory is None:
+            _sample_slices(self.__isosurface, self.__field, low, self.__step_size, 0, count)
+            self.__evaluations += count * count * count
+        else:
+            # Workers write blocks of x slices in the shared buffer, the blocks are stitched by construction
+            memory_name = self.__field_memory.name
+            blocks = [block for block in numpy.array_split(numpy.arange(count), self.__workers * 4) if len(block)]
+            with ProcessPoolExecutor(max_workers=self.__workers, mp_context=fork_context) as executor:
+                futures = [executor.submit(_sample_block, memory_name, count, self.__isosurface, low,
+                                           self.__step_size, int(block[0]), int(block[-1]) + 1)
+                           for block in blocks]
+                for future in futures:
+                    future.result()
+            self.__evaluations += count * count * count
+
+        if key is not None:
+            self.__cache.store(key, self.__field)
+        self.__known = self.__field, low, self.__step_size
+        return self.__field
+
+    def __sample_missing(self, low, count, indices):
+        """
+        Evaluate the grid points missing from the field buffer
+        :param low: The coordinate of the first grid point on each axis
+        :param count: The number of grid points per axis
+        :param indices: Array of the flat indices of the missing grid points
+        """
+        if self.__field_memory is None:
+            _sample_indices(self.__isosurface, self.__field, low, self.__step_size, indices)
+            return
+
+        memory_name = self.__field_memory.name
+        blocks = [block for block in numpy.array_split(indices, self.__workers * 4) if len(block)]
+        with ProcessPoolExecutor(max_workers=self.__workers, mp_context=fork_context) as executor:
+            futures = [executor.submit(_sample_index_block, memory_name, count, self.__isosurface, low,
+                                       self.__step_size, block)
+                       for block in blocks]
+            for future in futures:
+                future.result()
+
+    def reuse_field(self, generator):
+        """
+        Take over the field sampled by another generator of the same surface, the grid points shared by
+        both grids are not evaluated again. It works when the new grid is larger, has its step halved or
+        overlaps the old one. The previous generator no longer holds its field afterwards.
+        :param generator: The previous generator
+        """
+        if generator.__known is None or generator.__isosurface.signature() != self.__isosurface.signature():
+            return
 
-                    # Compute cube's vertices
-                    vertices = [
-                        mathutils.Vector((i, j, k + self.__step_size)),
-                        mathutils.Vector((i + self.__step_size, j, k + self.__step_size)),
-                        mathutils.Vector((i + self.__step_size, j, k)),
-                        mathutils.Vector((i, j, k)),
-                        mathutils.Vector((i, j + self.__step_size, k + self.__step_size)),
-                        mathutils.Vector((i + self.__step_size, j + self.__step_size, k + self.__step_size)),
-                        mathutils.Vector((i + self.__step_size, j + self.__step_size, k)),
-                        mathutils.Vector((i, j + self.__step_size, k)),
-                    ]
+        # Nothing to take over when the grids do not share any point
+        field, low, step = generator.__known
+        new_low, count = self.__lattice()
+        if not len(_lattice_matches(new_low, self.__step_size, count, low, step, field.shape[0])[0]):
+            return
 
-                    values = []
-                    for l in range(0, len(vertices)):
-                        values.append(self.__isosurface.test_point(vertices[l]))
+        # The buffer moves to this generator, the previous one gives it up
+        self.__known = generator.__known
+        generator.__release_field()
 
-                    cell = marching_cubes.GridCell(vertices, values)
-                    self.__faces.extend(marching_cubes.marching_cubes(cell, self.__isosurface.isovalue()))
+    def __sample_narrow_band(self, low, count):
+        """
+        Evaluate the field on a coarse grid first, then only evaluate the grid points of the coarse
+        blocks which can contain the isosurface. The other points get a value on the same side of the
+        isosurface as their block.
+        :param low: The coordinate of the first grid point on each axis
+        :param count: The number of grid points per axis
+        :return: The field buffer
+        """
+        self.__known = None
+        self.__allocate_field(count, shared=False)
+        iso_level = self.__isosurface.isovalue()
+
+        # Coarse grid points are grid points
+        coarse = numpy.unique(numpy.append(numpy.arange(0, count, self.__coarse_factor), count - 1))
+        coarse_axis = low + coarse * self.__step_size
+        points = numpy.stack(numpy.meshgrid(coarse_axis, coarse_axis, coarse_axis, indexing='ij'), axis=-1)
+        coarse_values = self.__isosurface.test_points(points.reshape(-1, 3)).reshape(points.shape[:3])
+        self.__evaluations += coarse_values.size
+
+        # Value range of the blocks
+        n = len(coarse) - 1
+        corners = [coarse_values[dx:n + dx, dy:n + dy, dz:n + dz] for dx, dy, dz in marching_cubes.corner_offsets]
+        lower = numpy.fmin.reduce(corners)
+        upper = numpy.fmax.reduce(corners)
+        margin = self.__isosurface.narrow_band_margin(self.__coarse_factor * self.__step_size, upper - lower)
+        active = (lower - margin <= iso_level) & (upper + margin >= iso_level)
+
+        # Nothing is known about the field around undefined values
+        active |= numpy.logical_or.reduce([numpy.isnan(c) for c in corners])
+
+        # Blocks holding each grid point, points on a block border belong to two blocks
+        first_block = numpy.clip(numpy.searchsorted(coarse, numpy.arange(count), side='right') - 1, 0, n - 1)
+        second_block = numpy.where(numpy.isin(numpy.arange(count), coarse), numpy.maximum(first_block - 1, 0),
+                                   first_block)
+        refined = numpy.zeros((count, count, count), dtype=bool)
+        for bx in (first_block, second_block):
+            for by in (first_block, second_block):
+                for bz in (first_block, second_block):
+                    refined |= active[numpy.ix_(bx, by, bz)]
+
+        # Skipped blocks have all their corners on the same side of the isosurface
+        below = coarse_values[:-1, :-1, :-1] < iso_level
+        self.__field[...] = numpy.where(below[numpy.ix_(first_block, first_block, first_block)],
+                                        iso_level - 1., iso_level + 1.)
+        self.__field[numpy.ix_(coarse, coarse, coarse)] = coarse_values
+        refined[numpy.ix_(coarse, coarse, coarse)] = False
+
+        # Evaluate the refined points by batches
+        indices = numpy.flatnonzero(refined)
+        _sample_indices(self.__isosurface, self.__field, low, self.__step_size, indices)
+        self.__evaluations += len(indices)
+
+        return self.__field
+
+    def stream_mesh(self):
+        """
+        Build mesh using marching cubes two z slices at a time, the memory used by the field only depends
+        on the grid cross-section
+        :return: Generator of (vertices, faces, normals) for each slab of cells, vertices are the new ones of
+        the slab and faces index into all the vertices yielded so far
+        """
+        low, count = self.__lattice()
+        self.__evaluations = 0
+        axis = low + numpy.arange(count) * self.__step_size
+
+        # Points of a slice, only their z coordinate changes from one slice to the next
+        points = numpy.empty((count, count, 3))
+        points[..., 0], points[..., 1] = numpy.meshgrid(axis, axis, indexing='ij')
+        points = points.reshape(-1, 3)
+
+        def slices():
+            for k in range(0, count):
+                points[:, 2] = axis[k]
+                self.__evaluations += count * count
+                yield self.__isosurface.test_points(points).reshape(count, count)
+
+        for vertices, faces in marching_cubes.marching_cubes_slabs(slices(), (low, low, low), self.__step_size,
+                                                                   self.__isosurface.isovalue(), self.__evaluate,
+                                                                   self.__refine_iterations):
+            yield vertices, faces, self.__vertex_normals(vertices)
+
+    def __vertex_normals(self, vertices, field=None, low=0.):
+        """
+        Compute the normal of vertices from the field gradient, analytic when the surface provides it and
+        interpolated from the grid otherwise. Normals point towards the higher field values, as the faces
+        are added to the scene.
+        :param vertices: Array of shape (n, 3) of the vertices
+        :param field: The field buffer, None when the grid is not fully sampled
+        :param low: The coordinate of the first grid point on each axis
+        :return: Array of shape (n, 3) of the normals, zero where the gradient vanishes
+        """
+        if field is None or type(self.__isosurface).gradients is not IsoSurface.gradients:
+            gradients = self.__isosurface.gradients(vertices)
+        else:
+            gradients = marching_cubes.field_gradients(field, (low, low, low), self.__step_size, vertices)
 
-        print(f"End of mesh generation found {str(len(self.__faces))} faces")
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            normals = gradients / numpy.linalg.norm(gradients, axis=1)[:, None]
+        return numpy.nan_to_num(normals, nan=0., posinf=0., neginf=0.)
+
+    def __adaptive_mesh(self):
+        """
+        Build mesh using marching cubes on an octree, the root cells cover the grid and can go past it
+        by less than one root cell
+        :return: The vertices and the faces
+        """
+        low, count = self.__lattice()
+        roots = math.ceil((count - 1) / 2 ** self.__levels)
+        return marching_cubes.adaptive_marching_cubes(self.__evaluate, (low, low, low), self.__step_size,
+                                                      (roots, roots, roots), self.__levels,
+                                                      self.__isosurface.isovalue(), self.__tolerance,
+                                                      self.__isosurface.narrow_band_margin, self.__refine_iterations)
+
+    def generate_mesh(self, streaming=False):
+        """
+        Build mesh using marching cubes
+        :param streaming: Evaluate the field slab by slab instead of sampling the whole grid, only for the
+        uniform extractor
+        """
+
+        if self.__extractor == 'adaptive':
+            self.__evaluations = 0
+            self.__vertices, self.__faces = self.__adaptive_mesh()
+            self.__normals = self.__vertex_normals(self.__vertices)
+        elif streaming and self.__extractor == 'uniform':
+            self.__release_field()
+            vertices = []
+            faces = []
+            normals = []
+            for slab_vertices, slab_faces, slab_normals in self.stream_mesh():
+                vertices.append(slab_vertices)
+                faces.append(slab_faces)
+                normals.append(slab_normals)
+            self.__vertices = numpy.concatenate(vertices) if vertices else numpy.empty((0, 3))
+            self.__faces = numpy.concatenate(faces) if faces else numpy.empty((0, 3), dtype=numpy.int64)
+            self.__normals = numpy.concatenate(normals) if normals else numpy.empty((0, 3))
+        else:
+            low, count = self.__lattice()
+            self.__evaluations = 0
+            if self.__coarse_factor > 1:
+                field = self.__sample_narrow_band(low, count)
+            else:
+                field = self.__sample_field(low, count)
+
+            origin = (low, low, low)
+            iso_level = self.__isosurface.isovalue()
+            if self.__extractor == 'surface_nets':
+                self.__vertices, self.__faces = dual_contouring.surface_nets(field, origin, self.__step_size,
+                                                                             iso_level, self.__evaluate,
+                                                                             self.__refine_iterations)
+            elif self.__extractor == 'dual_contouring':
+                self.__vertices, self.__faces = dual_contouring.dual_contouring(field, origin, self.__step_size,
+                                                                                iso_level,
+                                                                                self.__isosurface.gradients,
+                                                                                self.__evaluate,
+                                                                                self.__refine_iterations)
+            else:
+                self.__vertices, self.__faces = marching_cubes.marching_cubes_mesh(field, origin, self.__step_size,
+                                                                                   iso_level, self.__evaluate,
+                                                                                   self.__refine_iterations)
+
+            # Skipped blocks of the narrow band only hold the side of the isosurface
+            self.__normals = self.__vertex_normals(self.__vertices, None if self.__coarse_factor > 1 else field, low)
+
+        print(f"End of mesh generation found {str(len(self.__faces))} faces "
+              f"with {str(self.__evaluations)} field evaluations")
 
     def vertices(self):
         return self.__vertices
@@ -415,5 +1123,14 @@ class IsoSurfaceGenerator:
     def faces(self):
         return self.__faces
 
+    def normals(self):
+        return self.__normals
+
+    def field(self):
+        return self.__field
+
+    def evaluations(self):
+        return self.__evaluations
+
     def material(self):
         return self.__isosurface.material()
\ No newline at end of file
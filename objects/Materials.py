@@ -120,7 +120,14 @@ class NoiseMap(Material):
                  ground_color=(0.149, 0.030, 0., 1.),
                  water_color=(0.281, 0.52, 1., 1.),
                  grass_color=(0.009, 0.128, 0.000865, 1.),
-                 snow_color=(1., 1., 1., 1.)):
+                 snow_color=(1., 1., 1., 1.),
+                 displacement=True):
+        """
+
+        :param displacement: Displace the surface with the noise at render time, False when the mesh is
+        already displaced as Terrain does
+        """
+        self.__displacement = displacement
         self.__ground_color = ground_color
         self.__water_color = water_color
         self.__grass_color = grass_color
@@ -158,20 +165,21 @@ class NoiseMap(Material):
         mat.node_tree.links.new(separate_xyz.inputs["Vector"], tex_coord.outputs['Object'])
 
         # Displacement
-        tex_coord = mat.node_tree.nodes.new('ShaderNodeTexCoord')
-        mapping = mat.node_tree.nodes.new('ShaderNodeMapping')
-        noise_texture = mat.node_tree.nodes.new('ShaderNodeTexNoise')
-        noise_texture.inputs[2].default_value = 1.5
-        noise_texture.inputs[3].default_value = 6.6
-        noise_texture.inputs[4].default_value = 4.3
-        displacement = mat.node_tree.nodes.new('ShaderNodeDisplacement')
-
-        mat.node_tree.links.new(mapping.inputs[0], tex_coord.outputs[0])
-        mat.node_tree.links.new(noise_texture.inputs[0], mapping.outputs[0])
-        mat.node_tree.links.new(displacement.inputs[0], noise_texture.outputs[0])
-        mat.node_tree.links.new(mat.node_tree.nodes["Material Output"].inputs[2], displacement.outputs[0])
-
-        mat.cycles.displacement_method = 'BOTH'
+        if self.__displacement:
+            tex_coord = mat.node_tree.nodes.new('ShaderNodeTexCoord')
+            mapping = mat.node_tree.nodes.new('ShaderNodeMapping')
+            noise_texture = mat.node_tree.nodes.new('ShaderNodeTexNoise')
+            noise_texture.inputs[2].default_value = 1.5
+            noise_texture.inputs[3].default_value = 6.6
+            noise_texture.inputs[4].default_value = 4.3
+            displacement = mat.node_tree.nodes.new('ShaderNodeDisplacement')
+
+            mat.node_tree.links.new(mapping.inputs[0], tex_coord.outputs[0])
+            mat.node_tree.links.new(noise_texture.inputs[0], mapping.outputs[0])
+            mat.node_tree.links.new(displacement.inputs[0], noise_texture.outputs[0])
+            mat.node_tree.links.new(mat.node_tree.nodes["Material Output"].inputs[2], displacement.outputs[0])
+
+            mat.cycles.displacement_method = 'BOTH'
 
         # Assign it to object
         if obj.data.materials:
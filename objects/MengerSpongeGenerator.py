@@ -0,0 +1,99 @@
+import numpy
+
+# import objects.Materials
+from BlenderGenerator.objects import Materials
+
+# Largest number of iterations offered in Blender, the mesh takes about 800 MB at 5 iterations and each
+# iteration multiplies it by 20
+max_iterations = 5
+
+
+class MengerSpongeGenerator:
+    """
+    Class which aims to create the exact mesh of a Menger sponge from its subcubes, without sampling a field.
+    Only the faces between a kept subcube and the empty space are created.
+    """
+    def __init__(self, iterations=3, size=4.):
+        """
+
+        :param iterations: The number of holes iterations
+        :param size: The edge length of the sponge, centered on the origin
+        """
+        self.__iterations = iterations
+        self.__size = size
+
+        self.__vertices = []
+        self.__faces = []
+
+    def subcubes(self):
+        """
+        Compute the subcubes of the last iteration kept in the sponge. Each kept cube is split in 27 and
+        keeps the 20 children which do not have two coordinates in the middle, the others are in the middle
+        of a face or of the cube.
+        :return: Array of shape (20 ** iterations, 3) of the integer coordinates of the subcubes
+        """
+        offsets = numpy.stack(numpy.meshgrid(range(3), range(3), range(3), indexing='ij'), axis=-1).reshape(-1, 3)
+        children = offsets[(offsets == 1).sum(axis=1) < 2]
+
+        cubes = numpy.zeros((1, 3), dtype=numpy.int64)
+        for i in range(0, self.__iterations):
+            cubes = (cubes[:, None, :] * 3 + children).reshape(-1, 3)
+
+        return cubes
+
+    def generate_mesh(self):
+        """
+        Build the mesh with one quad per exposed subcube face, the vertices are shared between the quads
+        """
+        cubes = self.subcubes()
+        count = 3 ** self.__iterations
+
+        # Sorted keys of the subcubes on the lattice with a border of one, the neighbours are looked up in it
+        shape = (count + 2, count + 2, count + 2)
+        keys = numpy.sort(numpy.ravel_multi_index((cubes + 1).T, shape))
+        strides = numpy.array([shape[1] * shape[2], shape[2], 1])
+
+        # Quad corners are keyed on the lattice of the subcube corners
+        corner_shape = (count + 1, count + 1, count + 1)
+        corner_strides = numpy.array([corner_shape[1] * corner_shape[2], corner_shape[2], 1])
+        cube_corners = numpy.ravel_multi_index(cubes.T, corner_shape)
+
+        corners = []
+        for axis in range(0, 3):
+            # Quad corners in the two other axes, counterclockwise seen from the positive side of the axis
+            offsets = numpy.zeros((4, 3), dtype=numpy.int64)
+            offsets[:, (axis + 1) % 3] = [0, 1, 1, 0]
+            offsets[:, (axis + 2) % 3] = [0, 0, 1, 1]
+
+            for side in (1, -1):
+                # A face is exposed when the neighbour on this side is not a subcube, the outside is empty
+                neighbours = numpy.ravel_multi_index((cubes + 1).T, shape) + side * strides[axis]
+                positions = numpy.minimum(numpy.searchsorted(keys, neighbours), len(keys) - 1)
+                exposed = keys[positions] != neighbours
+                del neighbours, positions
+
+                side_offsets = offsets + (axis == numpy.arange(3)) if side > 0 else offsets[::-1]
+                corners.append(cube_corners[exposed][:, None] + side_offsets @ corner_strides)
+        del cubes, keys, cube_corners
+
+        # Vertices are merged by their position on the lattice of the subcube corners, numbered in the order
+        # of their keys. A byte per lattice point is far smaller than the corners of the quads.
+        used = numpy.zeros(corner_shape, dtype=bool).ravel()
+        for side_corners in corners:
+            used[side_corners] = True
+        numbers = numpy.cumsum(used, dtype=numpy.int32) - 1
+
+        lattice = numpy.stack(numpy.unravel_index(numpy.flatnonzero(used), corner_shape), axis=1)
+        self.__vertices = lattice * (self.__size / count) - self.__size / 2
+        self.__faces = numpy.concatenate([numbers[side_corners] for side_corners in corners])
+
+        print(f"End of mesh generation found {str(len(self.__faces))} faces")
+
+    def vertices(self):
+        return self.__vertices
+
+    def faces(self):
+        return self.__faces
+
+    def material(self):
+        return Materials.SmoothColor(color=(0.1, 0.1, 0.1, 0.))
@@ -0,0 +1,154 @@
+import math
+import numpy
+
+
+class ParametricSurface:
+    """
+    Class which aims to create the mesh of a parametric surface f(u, v) -> (x, y, z). The u and v axes are
+    sampled adaptively: an interval is split while the surface at its middle is further than the tolerance
+    from the chord between its ends, for any sample of the other axis. The samples stay a tensor product
+    grid, so the mesh has no cracks.
+    """
+    def __init__(self, function, u_range=(0., 2. * math.pi), v_range=(0., 2. * math.pi), wrap_u=False,
+                 wrap_v=False, resolution=(8, 8), tolerance=0.01, levels=6):
+        """
+
+        :param function: Vectorized function of the surface, takes arrays u and v broadcast together and
+        returns an array of their shape plus a last axis of size 3
+        :param u_range: First and last u values
+        :param v_range: First and last v values
+        :param wrap_u: The surface is closed along u, the last u value is the same point as the first one
+        :param wrap_v: The surface is closed along v, the last v value is the same point as the first one
+        :param resolution: Number of intervals of u and v before refinement
+        :param tolerance: Largest distance between the surface and the middle of the mesh edges
+        :param levels: Number of times an interval can be split
+        """
+        self.__function = function
+        self.__u_range = u_range
+        self.__v_range = v_range
+        self.__wrap_u = wrap_u
+        self.__wrap_v = wrap_v
+        self.__resolution = resolution
+        self.__tolerance = tolerance
+        self.__levels = levels
+
+        self.__us = []
+        self.__vs = []
+        self.__vertices = []
+        self.__faces = []
+
+    def __evaluate(self, us, vs):
+        """
+        Evaluate the surface on a grid
+        :param us: Array of the u values
+        :param vs: Array of the v values
+        :return: Array of shape (len(us), len(vs), 3) of the points
+        """
+        points = numpy.asarray(self.__function(us[:, None], vs[None, :]), dtype=numpy.float64)
+        return numpy.broadcast_to(points, (len(us), len(vs), 3))
+
+    @staticmethod
+    def __split(values, points, wrap, period, middle_points, tolerance):
+        """
+        Split the intervals of an axis whose middle points are too far from their chord
+        :param values: Array of the parameter values of the axis
+        :param points: Array of the grid points, the axis first
+        :param wrap: The axis is closed
+        :param period: Length of the parameter range of the axis
+        :param middle_points: Function evaluating the grid points at the given values of the axis
+        :param tolerance: Largest distance between the middle points and the chords
+        :return: The values and the points with the new samples, None when no interval is split
+        """
+        starts = values
+        ends = numpy.append(values[1:], values[0] + period) if wrap else values[1:]
+        middles = (starts[:len(ends)] + ends) / 2
+        end_points = numpy.concatenate((points[1:], points[:1])) if wrap else points[1:]
+
+        chords = (points[:len(ends)] + end_points) / 2
+        surface = middle_points(middles)
+        error = numpy.linalg.norm(surface - chords, axis=-1).max(axis=1)
+        split = numpy.flatnonzero(error > tolerance)
+        if not len(split):
+            return None
+
+        # Every new sample is inserted after the start of its interval
+        positions = split + 1
+        return numpy.insert(values, positions, middles[split]), numpy.insert(points, positions, surface[split], axis=0)
+
+    def generate_mesh(self):
+        """
+        Sample the surface and build one quad per grid cell, closed axes connect their last samples to
+        their first ones
+        """
+        u_period = self.__u_range[1] - self.__u_range[0]
+        v_period = self.__v_range[1] - self.__v_range[0]
+        us = numpy.linspace(self.__u_range[0], self.__u_range[1], self.__resolution[0] + 1)
+        vs = numpy.linspace(self.__v_range[0], self.__v_range[1], self.__resolution[1] + 1)
+        if self.__wrap_u:
+            us = us[:-1]
+        if self.__wrap_v:
+            vs = vs[:-1]
+        points = self.__evaluate(us, vs)
+
+        for level in range(0, self.__levels):
+            refined = False
+
+            split = self.__split(us, points, self.__wrap_u, u_period, lambda middles: self.__evaluate(middles, vs),
+                                 self.__tolerance)
+            if split is not None:
+                us, points = split
+                refined = True
+
+            split = self.__split(vs, points.swapaxes(0, 1), self.__wrap_v, v_period,
+                                 lambda middles: self.__evaluate(us, middles).swapaxes(0, 1), self.__tolerance)
+            if split is not None:
+                vs, points = split[0], split[1].swapaxes(0, 1)
+                refined = True
+
+            if not refined:
+                break
+
+        nu, nv = len(us), len(vs)
+        i = numpy.arange(nu if self.__wrap_u else nu - 1)[:, None]
+        j = numpy.arange(nv if self.__wrap_v else nv - 1)[None, :]
+        next_i = (i + 1) % nu
+        next_j = (j + 1) % nv
+
+        self.__us = us
+        self.__vs = vs
+        self.__vertices = numpy.ascontiguousarray(points).reshape(-1, 3)
+        self.__faces = numpy.stack(numpy.broadcast_arrays(i * nv + j, next_i * nv + j, next_i * nv + next_j,
+                                                          i * nv + next_j), axis=-1).reshape(-1, 4)
+
+        print(f"End of mesh generation found {str(len(self.__faces))} faces")
+
+    def us(self):
+        return self.__us
+
+    def vs(self):
+        return self.__vs
+
+    def vertices(self):
+        return self.__vertices
+
+    def faces(self):
+        return self.__faces
+
+
+def torus(first_circle_diameter=2., second_circle_diameter=1.5, origin=(0., 0., 0.)):
+    """
+    Build the function of the torus of Torus, closed along u and v
+    :param first_circle_diameter: Diameter of the first circle
+    :param second_circle_diameter: Diameter of the second circle
+    :param origin: Origin of the first circle
+    :return: Vectorized function of u and v
+    """
+    origin = numpy.asarray(origin, dtype=numpy.float64)
+
+    def function(u, v):
+        u, v = numpy.broadcast_arrays(u, v)
+        radius = first_circle_diameter + second_circle_diameter * numpy.cos(v)
+        return origin + numpy.stack((radius * numpy.cos(u), radius * numpy.sin(u),
+                                     second_circle_diameter * numpy.sin(v)), axis=-1)
+
+    return function
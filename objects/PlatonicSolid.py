@@ -1,13 +1,13 @@
 import math
-import mathutils
+import numpy
 
-from mathutils import Vector
 import bpy
 
-import bmesh
-
 from enum import Enum
 
+# import utils.BlenderUtils
+from BlenderGenerator.utils import BlenderUtils
+
 
 class Shape(Enum):
     TETRAHEDRON = 1
@@ -17,6 +17,109 @@ class Shape(Enum):
     ICOSAHEDRON = 5
 
 
+phi = (1 + math.sqrt(5)) / 2  # the golden ratio
+
+# Vertices of the solids for a circumradius of 1 and their triangles, counterclockwise seen from the outside.
+# Quads are split in two triangles and pentagons in three triangles.
+solids = {
+    # The three bottom vertices on a circle and the peak
+    Shape.TETRAHEDRON: (
+        numpy.array([(math.cos(i * 2 * math.pi / 3), math.sin(i * 2 * math.pi / 3), 0.) for i in range(0, 3)] +
+                    [(0., 0., math.sqrt(2))]) * (2 * math.sqrt(2) / 3),
+        numpy.array([(0, 2, 1), (0, 1, 3), (1, 2, 3), (2, 0, 3)])
+    ),
+    # The four bottom corners and the four top corners
+    Shape.HEXAHEDRON: (
+        numpy.array([(-1, -1, 0), (1, -1, 0), (1, 1, 0), (-1, 1, 0),
+                     (-1, -1, 2), (1, -1, 2), (1, 1, 2), (-1, 1, 2)]) / math.sqrt(3),
+        numpy.array([(3, 2, 1), (1, 0, 3), (5, 6, 7), (7, 4, 5), (0, 1, 5), (5, 4, 0),
+                     (1, 2, 6), (6, 5, 1), (2, 3, 7), (7, 6, 2), (3, 0, 4), (4, 7, 3)])
+    ),
+    # The square base and the two peaks
+    Shape.OCTAHEDRON: (
+        numpy.array([(math.cos(i * math.pi / 2), math.sin(i * math.pi / 2), 0.) for i in range(0, 4)] +
+                    [(0., 0., 1.), (0., 0., -1.)]),
+        numpy.array([(4, 3, 0), (4, 0, 1), (4, 1, 2), (4, 2, 3), (5, 0, 3), (5, 1, 0), (5, 2, 1), (5, 3, 2)])
+    ),
+    # A box and three golden rectangles perpendicular to the axes
+    Shape.DODECAHEDRON: (
+        numpy.array([(-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
+                     (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1),
+                     (0, -1 / phi, -phi), (0, -1 / phi, phi), (0, 1 / phi, phi), (0, 1 / phi, -phi),
+                     (-1 / phi, -phi, 0), (1 / phi, -phi, 0), (1 / phi, phi, 0), (-1 / phi, phi, 0),
+                     (-phi, 0, -1 / phi), (phi, 0, -1 / phi), (phi, 0, 1 / phi), (-phi, 0, 1 / phi)]) / math.sqrt(3),
+        numpy.array([(4, 12, 13), (4, 13, 5), (4, 5, 9), (6, 14, 15), (6, 15, 7), (6, 7, 10),
+                     (1, 13, 12), (1, 12, 0), (1, 0, 8), (3, 15, 14), (3, 14, 2), (3, 2, 11),
+                     (8, 0, 16), (8, 16, 3), (8, 3, 11), (11, 2, 17), (11, 17, 1), (11, 1, 8),
+                     (10, 7, 19), (10, 19, 4), (10, 4, 9), (9, 5, 18), (9, 18, 6), (9, 6, 10),
+                     (6, 18, 17), (6, 17, 2), (6, 2, 14), (1, 17, 18), (1, 18, 5), (1, 5, 13),
+                     (3, 16, 19), (3, 19, 7), (3, 7, 15), (4, 19, 16), (4, 16, 0), (4, 0, 12)])
+    ),
+    # Three golden rectangles perpendicular to the axes
+    Shape.ICOSAHEDRON: (
+        numpy.array([(0, -1, -phi), (0, -1, phi), (0, 1, phi), (0, 1, -phi),
+                     (-phi, 0, -1), (phi, 0, -1), (phi, 0, 1), (-phi, 0, 1),
+                     (-1, -phi, 0), (1, -phi, 0), (1, phi, 0), (-1, phi, 0)]) / math.sqrt(1 + phi * phi),
+        numpy.array([(9, 6, 1), (1, 8, 9), (1, 7, 8), (5, 6, 9), (6, 2, 1), (9, 0, 5), (0, 9, 8),
+                     (6, 10, 2), (6, 5, 10), (1, 2, 7), (2, 10, 11), (11, 7, 2), (5, 0, 3), (5, 3, 10),
+                     (11, 10, 3), (4, 7, 11), (8, 7, 4), (3, 0, 4), (8, 4, 0), (3, 4, 11)])
+    ),
+}
+
+
+def subdivide(vertices, faces):
+    """
+    Split every triangle in four at the middle of its edges. The middle of an edge shared by two triangles
+    is created once, its index is found from the edge.
+    :param vertices: Array of shape (n, 3) of the vertices
+    :param faces: Array of shape (m, 3) of the triangles
+    :return: The vertices followed by the middles of the edges and the triangles, four times more
+    """
+    # Edges of the triangles (a, b), (b, c), (c, a), keyed by their vertices in increasing order
+    edges = numpy.stack((faces, numpy.roll(faces, -1, axis=1)), axis=-1)
+    keys = numpy.sort(edges, axis=-1)
+    keys = keys[..., 0] * len(vertices) + keys[..., 1]
+    keys, first, inverse = numpy.unique(keys.ravel(), return_index=True, return_inverse=True)
+
+    first_edges = edges.reshape(-1, 2)[first]
+    middles = (vertices[first_edges[:, 0]] + vertices[first_edges[:, 1]]) / 2
+    middle_indices = len(vertices) + inverse.reshape(-1, 3)
+
+    a, b, c = faces.T
+    ab, bc, ca = middle_indices.T
+    new_faces = numpy.stack((numpy.stack((a, ab, ca), axis=1),
+                             numpy.stack((ab, b, bc), axis=1),
+                             numpy.stack((ca, bc, c), axis=1),
+                             numpy.stack((ab, bc, ca), axis=1)), axis=1).reshape(-1, 3)
+
+    return numpy.concatenate((vertices, middles)), new_faces
+
+
+def platonic_mesh(shape, radius=1., subdivisions=0, sphere=False):
+    """
+    Build the mesh of a platonic solid
+    :param shape: The Shape of the solid
+    :param radius: The scale of the solid
+    :param subdivisions: Number of times every triangle is split in four
+    :param sphere: Move the vertices on the sphere through the solid vertices after each subdivision, which
+    makes a geodesic sphere
+    :return: The vertices and the triangles
+    """
+    vertices, faces = solids[shape]
+    vertices = vertices * radius
+
+    center = vertices.mean(axis=0)
+    sphere_radius = numpy.linalg.norm(vertices[0] - center)
+
+    for i in range(0, subdivisions):
+        vertices, faces = subdivide(vertices, faces)
+        if sphere:
+            offsets = vertices - center
+            vertices = center + offsets * (sphere_radius / numpy.linalg.norm(offsets, axis=1))[:, None]
+
+    return vertices, faces
+
+
 class PlatonicSolid:
 
     def create_object(self):
@@ -31,312 +134,17 @@ class PlatonicSolid:
         bpy.data.objects["platon"].select_set(True)
 
         self.mesh = bpy.context.object.data
-        self.bm = bmesh.new()
-
-        if hasattr(self.bm.verts, "ensure_lookup_table"):
-            self.bm.verts.ensure_lookup_table()
 
     def finish_object(self):
-        # Recalculate normal.
-        self.bm.normal_update()
-
-        # make the bmesh the object's mesh
-        self.bm.to_mesh(self.mesh)
-        self.bm.free()  # always do this when finished
-
-    def make_quad_mesh(self, a, b, c, d):
-        """
-        Make a quad mesh from 4 vertices
-        :param a: the first vertex
-        :param b: the second vertex
-        :param c: the third vertex
-        :param d: the fourth vertex
-        """
-        self.bm.faces.new((a, b, c))
-        self.bm.faces.new((c, d, a))
-
-    def make_penta_mesh(self, a, b, c, d, e):
-        """
-        Make a mesh from 5 vertices in a regular pentagon shape
-        :param a: the first vertex
-        :param b: the second vertex
-        :param c: the third vertex
-        :param d: the fourth vertex
-        :param e: the fifth vertex
-        """
-        self.bm.faces.new((a, e, d))
-        self.bm.faces.new((a, d, c))
-        self.bm.faces.new((a, c, b))
-
-    def octahedron(self):
-        """
-        Make the octahedron
-        :return:
-        """
-        self.create_object()
+        # make the vertices and faces the object's mesh, smooth when it approximates a sphere
+        BlenderUtils.fill_mesh(self.mesh, self.vertices, self.faces, smooth=self.sphere)
 
-        edge_length = math.sqrt(2) * self.radius
-
-        # the base of the octahedron is a square, so it will be composed of 4 vertices
-        # the angle step between these four vertices will be 2pi / 4 = pi/2
-        angle_step = math.pi / 2
-
-        # Create the base of the object
-        base = []
-        for i in range(0, 4):
-            x = self.radius * math.cos(angle_step * i)
-            y = self.radius * math.sin(angle_step * i)
-            base.append(self.bm.verts.new((x, y, 0)))
-
-        # Create the peaks
-        top = self.bm.verts.new((0, 0, self.radius))
-        bottom = self.bm.verts.new((0, 0, -self.radius))
-
-        # Link the four vertices of the base with top peak
-        self.bm.faces.new((base[0], base[3], top))
-        self.bm.faces.new((base[1], base[0], top))
-        self.bm.faces.new((base[2], base[1], top))
-        self.bm.faces.new((base[3], base[2], top))
-
-        # Link the four vertices of the base with bottom peak
-        self.bm.faces.new((base[3], base[0], bottom))
-        self.bm.faces.new((base[0], base[1], bottom))
-        self.bm.faces.new((base[1], base[2], bottom))
-        self.bm.faces.new((base[2], base[3], bottom))
-
-        self.finish_object()
-
-    def hexahedron(self):
-        """
-        Make the hexahedron mesh (the cube)
-        """
-
-        self.create_object()
-        edge_length = math.sqrt(2) * self.radius  # From radius, we can get edge length
-        half_edge = edge_length / 2
-
-        # Create bottom vertices (the 4 corners, with a z value = 0)
-        bottom = []
-        bottom.append(self.bm.verts.new((-half_edge, -half_edge, 0)))
-        bottom.append(self.bm.verts.new((half_edge, -half_edge, 0)))
-        bottom.append(self.bm.verts.new((half_edge, half_edge, 0)))
-        bottom.append(self.bm.verts.new((-half_edge, half_edge, 0)))
-
-        # Create top vertices (the 4 corners, with a z value = length of an edge)
-        top = []
-        top.append(self.bm.verts.new((-half_edge, -half_edge, edge_length)))
-        top.append(self.bm.verts.new((half_edge, -half_edge, edge_length)))
-        top.append(self.bm.verts.new((half_edge, half_edge, edge_length)))
-        top.append(self.bm.verts.new((-half_edge, half_edge, edge_length)))
-
-        # Create two quad mesh for the bottom and the top
-        self.make_quad_mesh(bottom[3], bottom[2], bottom[1], bottom[0])
-        self.make_quad_mesh(top[3], top[2], top[1], top[0])
-
-        # Create mesh for the sides (between two bottom vertices and two top vertices)
-        self.make_quad_mesh(bottom[0], bottom[1], top[1], top[0])
-        self.make_quad_mesh(bottom[1], bottom[2], top[2], top[1])
-        self.make_quad_mesh(bottom[2], bottom[3], top[3], top[2])
-        self.make_quad_mesh(bottom[3], bottom[0], top[0], top[3])
-
-        self.finish_object()
-
-    def tetrahedron(self):
-        """
-        Make the tetrahedron
-        """
-
-        self.create_object()
-
-        # we want the angle step for the vertices composing the tetrahedron
-        # (2 * pi, a full circle, divided by 3 for the three vertices)
-        angle = 2 * math.pi / 3
-
-        # Determine the peak height
-        h = math.sqrt(2) * self.radius
-
-        # Create the three bottom vertices and every time the angle incremented with the step previously defined
-        sides = []
-        for i in range(0, 3):
-            x = self.radius * math.cos(i * angle)
-            y = self.radius * math.sin(i * angle)
-            sides.append(self.bm.verts.new((x, y, 0)))
-
-        # Create the peak
-        peak = self.bm.verts.new((0, 0, h))
-
-        # Create the faces of the mesh : the bottom triangle and the three triangles on the sides
-        self.bm.faces.new((sides[0], sides[2], sides[1]))
-        self.bm.faces.new((sides[0], sides[1], peak))
-        self.bm.faces.new((sides[1], sides[2], peak))
-        self.bm.faces.new((sides[2], sides[0], peak))
-
-        self.finish_object()
-
-    def dodecahedron(self):
-        """
-        Make the dodecahedron
-        """
-
-        self.create_object()
-
-        m = 1 / math.sqrt(3) * self.radius
-        phi = (1 + math.sqrt(5)) / 2  # the golden ratio
-
-        r1 = 1 * m
-        phi1 = phi * m
-        iphi1 = (1. / phi) * m
-
-        # Create the 20 vertices of the dodecahedron
-
-        # Create a box to contain 8 vertices
-        cube_bottom = []
-        cube_bottom.append(self.bm.verts.new((-r1, -r1, -r1)))
-        cube_bottom.append(self.bm.verts.new((r1, -r1, -r1)))
-        cube_bottom.append(self.bm.verts.new((r1, r1, -r1)))
-        cube_bottom.append(self.bm.verts.new((-r1, r1, -r1)))
-
-        cube_top = []
-        cube_top.append(self.bm.verts.new((-r1, -r1, r1)))
-        cube_top.append(self.bm.verts.new((r1, -r1, r1)))
-        cube_top.append(self.bm.verts.new((r1, r1, r1)))
-        cube_top.append(self.bm.verts.new((-r1, r1, r1)))
-
-        # Create three rectangles that contain the 12 other vertices
-
-        # One perpendicular to x-axis of coordinates (0, +- 1/phi, +- phi)
-        x_rect = []
-        x_rect.append(self.bm.verts.new((0, -iphi1, -phi1)))
-        x_rect.append(self.bm.verts.new((0, -iphi1, phi1)))
-        x_rect.append(self.bm.verts.new((0, iphi1, phi1)))
-        x_rect.append(self.bm.verts.new((0, iphi1, -phi1)))
-
-        # One perpendicular to y-axis of coordinates (+- phi, +- 1/phi, 0)
-        z_rect = []
-        z_rect.append(self.bm.verts.new((-iphi1, -phi1, 0)))
-        z_rect.append(self.bm.verts.new((iphi1, -phi1, 0)))
-        z_rect.append(self.bm.verts.new((iphi1, phi1, 0)))
-        z_rect.append(self.bm.verts.new((-iphi1, phi1, 0)))
-
-        # One perpendicular to y-axis of coordinates (+- 1/phi, 0, +- phi)
-        y_rect = []
-        y_rect.append(self.bm.verts.new((-phi1, 0, -iphi1)))
-        y_rect.append(self.bm.verts.new((phi1, 0, -iphi1)))
-        y_rect.append(self.bm.verts.new((phi1, 0, iphi1)))
-        y_rect.append(self.bm.verts.new((-phi1, 0, iphi1)))
-
-        # Create the 12 pentagons of the dodecahedron from golden rectangles and box
-        self.make_penta_mesh(cube_top[0], x_rect[1], cube_top[1], z_rect[1], z_rect[0])
-        self.make_penta_mesh(cube_top[2], x_rect[2], cube_top[3], z_rect[3], z_rect[2])
-
-        self.make_penta_mesh(cube_bottom[1], x_rect[0], cube_bottom[0], z_rect[0], z_rect[1])
-        self.make_penta_mesh(cube_bottom[3], x_rect[3], cube_bottom[2], z_rect[2], z_rect[3])
-
-        self.make_penta_mesh(x_rect[0], x_rect[3], cube_bottom[3], y_rect[0], cube_bottom[0])
-        self.make_penta_mesh(x_rect[3], x_rect[0], cube_bottom[1], y_rect[1], cube_bottom[2])
-
-        self.make_penta_mesh(x_rect[2], x_rect[1], cube_top[0], y_rect[3], cube_top[3])
-        self.make_penta_mesh(x_rect[1], x_rect[2], cube_top[2], y_rect[2], cube_top[1])
-
-        self.make_penta_mesh(cube_top[2], z_rect[2], cube_bottom[2], y_rect[1], y_rect[2])
-        self.make_penta_mesh(cube_bottom[1], z_rect[1], cube_top[1], y_rect[2], y_rect[1])
-
-        self.make_penta_mesh(cube_bottom[3], z_rect[3], cube_top[3], y_rect[3], y_rect[0])
-        self.make_penta_mesh(cube_top[0], z_rect[0], cube_bottom[0], y_rect[0], y_rect[3])
-
-        self.finish_object()
-
-    def icosahedron(self):
-        """
-        Make the icosahedron
-        :return:
-        """
-        self.create_object()
-
-        m = 1 / math.sqrt(3) * self.radius
-        phi = (1 + math.sqrt(5)) / 2  # golden ratio
-
-        ephi = phi * m
-        iphi = 1.5 * phi
-
-        # Create three rectangles to contain the all vertices using golden ratio
-        x_rectangle = []
-        x_rectangle.append(self.bm.verts.new((0, -iphi, -ephi)))
-        x_rectangle.append(self.bm.verts.new((0, -iphi, ephi)))
-        x_rectangle.append(self.bm.verts.new((0, iphi, ephi)))
-        x_rectangle.append(self.bm.verts.new((0, iphi, -ephi)))
-
-        y_rectangle = []
-        y_rectangle.append(self.bm.verts.new((-ephi, 0, -iphi)))
-        y_rectangle.append(self.bm.verts.new((ephi, 0, -iphi)))
-        y_rectangle.append(self.bm.verts.new((ephi, 0, iphi)))
-        y_rectangle.append(self.bm.verts.new((-ephi, 0, iphi)))
-
-        z_rectangle = []
-        z_rectangle.append(self.bm.verts.new((-iphi, -ephi, 0)))
-        z_rectangle.append(self.bm.verts.new((iphi, -ephi, 0)))
-        z_rectangle.append(self.bm.verts.new((iphi, ephi, 0)))
-        z_rectangle.append(self.bm.verts.new((-iphi, ephi, 0)))
-
-
-        if hasattr(self.bm.verts, "ensure_lookup_table"):
-            self.bm.verts.ensure_lookup_table()
-
-        # Make the 20 faces between the 12 vertices
-
-        x0 = self.bm.verts[0]
-        x1 = self.bm.verts[1]
-        x2 = self.bm.verts[2]
-        x3 = self.bm.verts[3]
-        y0 = self.bm.verts[4]
-        y1 = self.bm.verts[5]
-        y2 = self.bm.verts[6]
-        y3 = self.bm.verts[7]
-        z0 = self.bm.verts[8]
-        z1 = self.bm.verts[9]
-        z2 = self.bm.verts[10]
-        z3 = self.bm.verts[11]
-
-        self.bm.faces.new((x1, y2, z1))
-        self.bm.faces.new((x1, z0, z1))
-        self.bm.faces.new((x1, y3, z0))
-        self.bm.faces.new((y1, y2, z1))
-        self.bm.faces.new((y2, x2, x1))
-
-        self.bm.faces.new((z1, x0, y1))
-        self.bm.faces.new((z0, z1, x0))
-        self.bm.faces.new((y2, z2, x2))
-        self.bm.faces.new((y2, y1, z2))
-        self.bm.faces.new((x1, x2, y3))
-
-        self.bm.faces.new((z3, z2, x2))
-        self.bm.faces.new((x2, y3, z3))
-        self.bm.faces.new((y1, x0, x3))
-        self.bm.faces.new((y1, x3, z2))
-        self.bm.faces.new((z3, z2, x3))
-
-        self.bm.faces.new((y0, y3, z3))
-        self.bm.faces.new((z0, y3, y0))
-        self.bm.faces.new((y0, x0, x3))
-        self.bm.faces.new((x0, y0, z0))
-        self.bm.faces.new((x3, y0, z3))
-
-        self.finish_object()
-
-    def __init__(self, radius, type):
+    def __init__(self, radius, type, subdivisions=0, sphere=False):
         self.__location = (0.0, 0.0, 0.0)
         self.radius = radius
-        if type == Shape.TETRAHEDRON:
-            self.tetrahedron()
-        elif type == Shape.HEXAHEDRON:
-            self.hexahedron()
-        elif type == Shape.OCTAHEDRON:
-            self.octahedron()
-        elif type == Shape.DODECAHEDRON:
-            self.dodecahedron()
-        elif type == Shape.ICOSAHEDRON:
-            self.icosahedron()
-        self.bm = None
+        self.sphere = sphere
         self.mesh = None
 
-
+        self.create_object()
+        self.vertices, self.faces = platonic_mesh(type, radius, subdivisions, sphere)
+        self.finish_object()
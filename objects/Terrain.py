@@ -0,0 +1,204 @@
+import numpy
+
+# import utils.noise
+from BlenderGenerator.utils import noise
+
+
+class Terrain:
+    """
+    Describe a heightfield terrain, the height is the fractal noise displacement of the NoiseMap material
+    applied to a plane
+    """
+    def __init__(self, size=2., scale=1.5, detail=6.6, roughness=1., strength=1., midlevel=0.5):
+        """
+
+        :param size: The edge length of the plane whose generated texture coordinates go from 0 to 1
+        :param scale: The scale of the noise texture
+        :param detail: The detail of the noise texture
+        :param roughness: The roughness of the noise texture, Blender clamps it to 1
+        :param strength: The scale of the displacement
+        :param midlevel: The noise value which is not displaced
+        """
+        self.__size = size
+        self.__scale = scale
+        self.__detail = detail
+        self.__roughness = min(roughness, 1.)
+        self.__strength = strength
+        self.__midlevel = midlevel
+
+        self.__vertices = []
+        self.__faces = []
+
+    def size(self):
+        return self.__size
+
+    def heights(self, x, y):
+        """
+        Compute the height of the terrain at several positions, the terrain goes on outside of the plane
+        :param x: Array of the x coordinates
+        :param y: Array of the y coordinates, broadcast with x
+        :return: Array of the heights
+        """
+        x, y = numpy.broadcast_arrays(x, y)
+
+        # Generated texture coordinates of the plane, the flat z axis is in the middle
+        points = numpy.empty(x.shape + (3,))
+        points[..., 0] = x / self.__size + 0.5
+        points[..., 1] = y / self.__size + 0.5
+        points[..., 2] = 0.5
+
+        values = noise.fractal_noise(points.reshape(-1, 3) * self.__scale, self.__detail, self.__roughness)
+        return (values.reshape(x.shape) - self.__midlevel) * self.__strength
+
+    def grid(self, low, extent, resolution):
+        """
+        Build the mesh of a square of the terrain
+        :param low: The (x, y) coordinates of the square corner with the lowest coordinates
+        :param extent: The edge length of the square
+        :param resolution: The number of quads along an edge
+        :return: The vertices, (resolution + 1) ** 2 rows by rows of increasing y, and the quads
+        """
+        axis = numpy.linspace(0., extent, resolution + 1)
+        y, x = numpy.meshgrid(low[1] + axis, low[0] + axis, indexing='ij')
+        vertices = numpy.stack((x, y, self.heights(x, y)), axis=-1).reshape(-1, 3)
+
+        # Quads counterclockwise seen from above
+        row = resolution + 1
+        corners = (numpy.arange(resolution)[:, None] * row + numpy.arange(resolution)[None, :]).ravel()
+        faces = corners[:, None] + numpy.array([0, 1, row + 1, row])
+
+        return vertices, faces
+
+    def generate_mesh(self, resolution=256):
+        """
+        Build the mesh of the plane of the terrain
+        :param resolution: The number of quads along an edge of the plane
+        """
+        self.__vertices, self.__faces = self.grid((-self.__size / 2, -self.__size / 2), self.__size, resolution)
+
+        print(f"End of mesh generation found {str(len(self.__faces))} faces")
+
+    def vertices(self):
+        return self.__vertices
+
+    def faces(self):
+        return self.__faces
+
+
+class ChunkedTerrain:
+    """
+    Describe a terrain split in square chunks around a camera. Only the chunks close enough to the camera
+    exist, each one with a resolution decreasing with its distance to the camera. The chunks have skirts
+    hanging down from their borders, they hide the cracks between neighbours of different resolutions.
+    """
+    def __init__(self, terrain=None, chunk_size=2., resolution=64, lod_distance=4., levels=5, view_distance=20.,
+                 skirt_depth=1.):
+        """
+
+        :param terrain: The Terrain giving the heights
+        :param chunk_size: The edge length of the chunks
+        :param resolution: The number of quads along an edge of the closest chunks, a power of two keeps
+        the vertices of coarse chunks on the borders of the fine ones
+        :param lod_distance: The distance under which the chunks have the full resolution, it is halved each
+        time the distance doubles
+        :param levels: Number of times the resolution can be halved
+        :param view_distance: Largest distance between the camera and the center of a chunk
+        :param skirt_depth: The height of the skirts, the height range of the terrain hides every crack
+        """
+        self.__terrain = terrain if terrain is not None else Terrain()
+        self.__chunk_size = chunk_size
+        self.__resolution = resolution
+        self.__lod_distance = lod_distance
+        self.__levels = levels
+        self.__view_distance = view_distance
+        self.__skirt_depth = skirt_depth
+
+        # Meshes of the chunks by (tile, lod) and lod of the chunks of the last update by tile
+        self.__cache = {}
+        self.__chunks = {}
+
+    def lod(self, distance):
+        """
+        Compute the level of detail of a chunk
+        :param distance: The distance between the camera and the chunk center
+        :return: The number of times the resolution is halved
+        """
+        if distance <= self.__lod_distance:
+            return 0
+        level = int(numpy.floor(numpy.log2(distance / self.__lod_distance))) + 1
+        return min(level, self.__levels, max(int(numpy.log2(self.__resolution)), 0))
+
+    def visible_tiles(self, camera):
+        """
+        Find the chunks close enough to the camera
+        :param camera: The (x, y, z) location of the camera
+        :return: Dictionary of the level of detail of every visible chunk by its (i, j) tile
+        """
+        size = self.__chunk_size
+        first = numpy.floor((numpy.asarray(camera[:2]) - self.__view_distance) / size).astype(int)
+        last = numpy.floor((numpy.asarray(camera[:2]) + self.__view_distance) / size).astype(int)
+        i, j = numpy.meshgrid(numpy.arange(first[0], last[0] + 1), numpy.arange(first[1], last[1] + 1),
+                              indexing='ij')
+
+        # Distance between the camera and the chunk centers, the camera height counts
+        dx = (i + 0.5) * size - camera[0]
+        dy = (j + 0.5) * size - camera[1]
+        distances = numpy.sqrt(dx * dx + dy * dy + camera[2] * camera[2])
+        visible = numpy.hypot(dx, dy) <= self.__view_distance
+
+        return {(int(ti), int(tj)): self.lod(distance)
+                for ti, tj, distance in zip(i[visible], j[visible], distances[visible])}
+
+    def chunk(self, tile, lod):
+        """
+        Build the mesh of a chunk, with skirts along its four borders
+        :param tile: The (i, j) tile of the chunk
+        :param lod: The number of times the resolution is halved
+        :return: The vertices and the quads
+        """
+        key = (tile, lod)
+        if key in self.__cache:
+            return self.__cache[key]
+
+        resolution = max(self.__resolution >> lod, 1)
+        low = (tile[0] * self.__chunk_size, tile[1] * self.__chunk_size)
+        vertices, faces = self.__terrain.grid(low, self.__chunk_size, resolution)
+
+        # Border vertices counterclockwise seen from above, then the same vertices lowered by the skirt depth
+        row = resolution + 1
+        steps = numpy.arange(resolution)
+        border = numpy.concatenate((steps, resolution + steps * row, row * row - 1 - steps,
+                                    (resolution - steps) * row))
+        skirt = vertices[border]
+        skirt[:, 2] -= self.__skirt_depth
+
+        # Skirt quads facing outwards
+        start = len(vertices)
+        following = numpy.roll(numpy.arange(len(border)), -1)
+        skirt_faces = numpy.stack((border, start + numpy.arange(len(border)), start + following, border[following]),
+                                  axis=1)
+
+        self.__cache[key] = numpy.concatenate((vertices, skirt)), numpy.concatenate((faces, skirt_faces))
+        return self.__cache[key]
+
+    def update(self, camera):
+        """
+        Select the chunks around the camera and build the ones whose tile or level of detail changed. The
+        cached meshes of tiles which are no longer visible are released.
+        :param camera: The (x, y, z) location of the camera
+        :return: The tiles to remove and the dictionary of the (lod, vertices, faces) of the tiles to add or
+        replace
+        """
+        tiles = self.visible_tiles(camera)
+
+        removed = [tile for tile in self.__chunks if tile not in tiles]
+        changed = {tile: (lod,) + self.chunk(tile, lod)
+                   for tile, lod in tiles.items() if self.__chunks.get(tile) != lod}
+
+        self.__cache = {key: mesh for key, mesh in self.__cache.items() if key[0] in tiles}
+        self.__chunks = tiles
+
+        return removed, changed
+
+    def chunks(self):
+        return self.__chunks
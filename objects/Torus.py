@@ -1,5 +1,6 @@
 import math
 import mathutils
+import numpy
 # Based on https://gamedev.stackexchange.com/questions/16845/how-do-i-generate-a-torus-mesh
 
 
@@ -15,12 +16,10 @@ class Torus:
         :param vertices_per_circles: Number of vertices per circles.
         """
 
-        self.__vertices_dictionary = {}
         self.__origin = origin
         self.__fc_diameter = first_circle_diameter
         self.__sc_diameter = second_circle_diameter
         self.__vertices_per_circles = vertices_per_circles
-        self.__vertices_number = 0
         self.__us = []
         self.__vs = []
 
@@ -30,142 +29,47 @@ class Torus:
 
         self.generate()
 
-    def __get_w(self, u):
+    def __angles(self):
         """
-        Generate first circle points.
-
-        :param u: Current angle
-        :return: Point corresponding to angle.
-        """
-        return mathutils.Vector((math.cos(u), math.sin(u), 0))
-
-    def __get_q(self, u, v):
-        """
-        Generate second circle points.
-        :param u: First circle angle
-        :param v: Second circle angle
-        :return: Point corresponding to both angles.
+        Generate the angles of the points of a circle, accumulated step by step
+        :return: Array of the angles
         """
-        if u not in self.__vertices_dictionary:
-            self.__vertices_dictionary[u] = {}
-
-        self.__vertices_dictionary[u][v] = self.__vertices_number
-        self.__vertices_number += 1
-
-        w = self.__get_w(u)
-        fc = self.__fc_diameter * w.xyz
-
-        cosv = math.cos(v)
-        sc = self.__sc_diameter * w.xyz * cosv
-        ls = mathutils.Vector((0,
-                               0,
-                               self.__sc_diameter * math.sin(v)))
-
-        return self.__origin.xyz + fc.xyz + sc.xyz + ls.xyz
+        angle_step = ((2. * math.pi) / self.__vertices_per_circles)
+        steps = numpy.full(self.__vertices_per_circles, angle_step)
+        steps[0] = 0.
+        return numpy.cumsum(steps)
 
     def generate(self):
         """
         Generate torus mesh data.
+        The vertex of the angles (us[i], vs[j]) has the index i * vertices_per_circles + j.
         """
-        # Clear potential pre used data.
-        self.__us.clear()
-        self.__vs.clear()
-        self.__mesh_vertices.clear()
-        self.__mesh_triangles.clear()
-        self.__vertices_dictionary.clear()
-
-        vs_complete = False
-        self.__vertices_number = 0
-
-        angle_step = ((2. * math.pi) / self.__vertices_per_circles)
-        angle = 0.
-
-        # vertices generation
-        for i in range(0, self.__vertices_per_circles):
-            self.__us.append(angle)
-            second_angle = 0.
-            for j in range(0, self.__vertices_per_circles):
-                if not vs_complete:
-                    self.__vs.append(second_angle)
-
-                self.__mesh_vertices.append(
-                    self.__get_q(angle, second_angle)
-                )
-
-                second_angle += angle_step
-
-            vs_complete = True
-            angle += angle_step
-
-        for i in range(0, len(self.__us)):
-            for j in range(0, len(self.__vs)):
-
-                # First triangle
-                # (u, v)
-                self.__mesh_triangles.append(
-                    self.__vertices_dictionary[self.__us[i]][self.__vs[j]]
-                )
-
-                # (u, v + 1)
-                if j == len(self.__vs) - 1:
-                    self.__mesh_triangles.append(
-                        self.__vertices_dictionary[self.__us[i]][self.__vs[0]]
-                    )
-                else:
-                    self.__mesh_triangles.append(
-                        self.__vertices_dictionary[self.__us[i]][self.__vs[j + 1]]
-                    )
-
-                # (u - 1, v)
-                if i == 0:
-                    self.__mesh_triangles.append(
-                        self.__vertices_dictionary[self.__us[len(self.__us) - 1]][self.__vs[j]]
-                    )
-                else:
-                    self.__mesh_triangles.append(
-                        self.__vertices_dictionary[self.__us[i - 1]][self.__vs[j]]
-                    )
-
-                # Second triangle
-                # (u - 1, v)
-                if i == 0:
-                    self.__mesh_triangles.append(
-                        self.__vertices_dictionary[self.__us[len(self.__us) - 1]][self.__vs[j]]
-                    )
-                else:
-                    self.__mesh_triangles.append(
-                        self.__vertices_dictionary[self.__us[i - 1]][self.__vs[j]]
-                    )
-
-                # (u, v + 1)
-                if j == len(self.__vs) - 1:
-                    self.__mesh_triangles.append(
-                        self.__vertices_dictionary[self.__us[i]][self.__vs[0]]
-                    )
-                else:
-                    self.__mesh_triangles.append(
-                        self.__vertices_dictionary[self.__us[i]][self.__vs[j + 1]]
-                    )
-
-                # (u - 1, v + 1)
-                u_value = 0
-                v_value = 0
-                if i == 0:
-                    u_value = self.__us[len(self.__us) - 1]
-                else:
-                    u_value = self.__us[i - 1]
-
-                if j == len(self.__vs) - 1:
-                    v_value = self.__vs[0]
-                else:
-                    v_value = self.__vs[j + 1]
-
-                self.__mesh_triangles.append(
-                    self.__vertices_dictionary[u_value][v_value]
-                )
-
-        for i in range(0, len(self.__mesh_vertices)):
-            self.__mesh_uvs.append((self.__mesh_vertices[i].x, self.__mesh_vertices[i].z))
+        count = self.__vertices_per_circles
+        self.__us = self.__angles()
+        self.__vs = self.__angles()
+
+        # First circle points and second circle points of every vertex
+        u = self.__us[:, None]
+        v = self.__vs[None, :]
+        w = numpy.stack(numpy.broadcast_arrays(numpy.cos(u), numpy.sin(u), numpy.zeros_like(u)), axis=-1)
+        fc = self.__fc_diameter * w
+        sc = self.__sc_diameter * w * numpy.cos(v)[..., None]
+        ls = numpy.zeros((1, count, 3))
+        ls[..., 2] = self.__sc_diameter * numpy.sin(v)
+
+        self.__mesh_vertices = (numpy.asarray(self.__origin, dtype=numpy.float64) + fc + sc + ls).reshape(-1, 3)
+
+        # Two triangles per quad (u - 1, u) x (v, v + 1), the circles wrap around
+        i = numpy.arange(count)[:, None]
+        j = numpy.arange(count)[None, :]
+        previous_i = (i - 1) % count
+        next_j = (j + 1) % count
+        self.__mesh_triangles = numpy.stack(numpy.broadcast_arrays(
+            i * count + j, i * count + next_j, previous_i * count + j,
+            previous_i * count + j, i * count + next_j, previous_i * count + next_j
+        ), axis=-1).ravel()
+
+        self.__mesh_uvs = self.__mesh_vertices[:, [0, 2]]
 
     def vertices(self):
         """
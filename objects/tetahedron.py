@@ -1,5 +1,6 @@
 import math
 import mathutils
+import numpy
 
 from mathutils import Vector
 import bpy
@@ -64,3 +65,93 @@ class Tetrahedron:
         for vert in self.__vertices:
             res.append((vert[0] + self.__location[0], vert[1] + self.__location[1], vert[2] + self.__location[2]))
         return res
+
+
+class SierpinskiTetrahedron:
+    """
+    Describe a Sierpinski tetrahedron, every tetrahedron cell of the last iteration is computed at once
+    """
+
+    # Triangles of a tetrahedron cell
+    cell_faces = numpy.array([[0, 1, 2], [0, 1, 3], [1, 2, 3], [2, 3, 0]])
+
+    def __init__(self, iterations, scale=4, weld=False, solid_base=False):
+        """
+
+        :param iterations: iterations of the tetrahedron
+        :param scale: scale of the initial tetrahedron
+        :param weld: Share the vertices of the cells touching each other
+        :param solid_base: The tetrahedron stands on an opaque ground, the base triangles of the cells on the
+        ground cannot be seen and are not generated
+        """
+        self.__iterations = iterations
+        self.__scale = scale
+        self.__weld = weld
+        self.__solid_base = solid_base
+
+        self.__vertices = []
+        self.__faces = []
+
+        self.generate()
+
+    def locations(self):
+        """
+        Compute the location of every tetrahedron cell, each iteration moves the cells of the previous
+        one towards the four vertices of a cell half their scale
+        :return: Array of shape (4 ** iterations, 3), cells of the same parent cell are consecutive
+        """
+        cell = numpy.array(Tetrahedron(1).calculate_vertices())
+        locations = numpy.zeros((1, 3))
+        for i in range(1, self.__iterations + 1):
+            locations = (locations[:, None, :] + cell * (self.__scale / 2 ** i)).reshape(-1, 3)
+        return locations
+
+    def barycentric_locations(self):
+        """
+        Compute the location of every tetrahedron cell as integer weights of the four vertices of the
+        initial tetrahedron, in units of the last iteration scale
+        :return: Array of shape (4 ** iterations, 4), in the order of the locations
+        """
+        weights = numpy.zeros((1, 4), dtype=numpy.int64)
+        for i in range(1, self.__iterations + 1):
+            weights = (weights[:, None, :] + numpy.eye(4, dtype=numpy.int64) * 2 ** (self.__iterations - i))
+            weights = weights.reshape(-1, 4)
+        return weights
+
+    def generate(self):
+        """
+        Generate the four vertices and the four triangles of every tetrahedron cell
+        """
+        cell = numpy.array(Tetrahedron(self.__scale / 2 ** self.__iterations).calculate_vertices())
+        locations = self.locations()
+
+        vertices = (cell + locations[:, None, :]).reshape(-1, 3)
+        faces = (numpy.arange(0, len(vertices), 4)[:, None, None] + self.cell_faces)
+
+        if self.__weld or self.__solid_base:
+            weights = self.barycentric_locations()
+
+        if self.__solid_base:
+            # Cells never moved towards the top vertex have their base triangle on the ground
+            visible = numpy.ones(faces.shape[:2], dtype=bool)
+            visible[weights[:, 3] == 0, 0] = False
+            faces = faces[visible]
+        faces = faces.reshape(-1, 3)
+
+        if self.__weld:
+            # Cell vertices are the cell weights plus one unit towards a vertex, equal weights are the same point
+            corners = weights[:, None, :] + numpy.eye(4, dtype=numpy.int64)
+            size = 2 ** self.__iterations + 1
+            keys = ((corners[..., 0] * size + corners[..., 1]) * size + corners[..., 2]).ravel()
+            keys, first, inverse = numpy.unique(keys, return_index=True, return_inverse=True)
+            vertices = vertices[first]
+            faces = inverse.ravel()[faces]
+
+        self.__vertices = vertices
+        self.__faces = faces
+
+    def vertices(self):
+        return self.__vertices
+
+    def faces(self):
+        return self.__faces
@@ -1,15 +1,96 @@
 import bpy
-import bmesh
 
 # import objects.Materials
+from BlenderGenerator.utils import BlenderUtils
 from BlenderGenerator.objects import Materials
+from BlenderGenerator.objects.Terrain import Terrain, ChunkedTerrain
 
+# State of the chunked map kept between updates: its settings, its chunks, the objects of the tiles and the
+# material shared by the chunks
+_settings = None
+_chunked_terrain = None
+_objects = {}
+_material = None
 
-def Map():
-    bpy.ops.mesh.primitive_plane_add(2, enter_editmode=True)
-    obj = bpy.context.object
-    bpy.ops.object.mode_set(mode="EDIT")
-    bpy.ops.mesh.subdivide(number_cuts=100)
-    bpy.ops.object.mode_set(mode="OBJECT")
 
-    Materials.NoiseMap().apply_material(obj)
+def Map(resolution=256):
+    """
+    Generate the noise map terrain, the relief is in the mesh instead of render time displacement
+    :param resolution: number of quads along an edge of the map
+    """
+    mesh = bpy.data.meshes.new("map_mesh")  # add a new mesh
+    obj = bpy.data.objects.new("map", mesh)  # add a new object using the mesh
+
+    bpy.context.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj  # set as the active object in the scene
+
+    bpy.data.objects["map"].select_set(True)
+    mesh = bpy.context.object.data
+
+    terrain = Terrain()
+    terrain.generate_mesh(resolution)
+
+    BlenderUtils.fill_mesh(mesh, terrain.vertices(), terrain.faces(), smooth=True)
+
+    Materials.NoiseMap(displacement=False).apply_material(obj)
+
+
+def _remove_chunk(tile):
+    """
+    Delete the object and the mesh of a tile of the chunked map
+    :param tile: the (i, j) tile of the chunk
+    """
+    name = _objects.pop(tile)
+    obj = bpy.data.objects.get(name)
+    if obj is not None:
+        mesh = obj.data
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+
+
+def chunked_map(chunk_size=2., resolution=64, view_distance=20.):
+    """
+    Generate or update the noise map terrain around the scene camera. Only the chunks whose tile or level of
+    detail changed since the last call are built, the others keep their object.
+    :param chunk_size: edge length of the chunks
+    :param resolution: number of quads along an edge of the chunks closest to the camera
+    :param view_distance: largest distance between the camera and the center of a chunk
+    """
+    global _settings, _chunked_terrain, _material
+
+    # New settings or chunks deleted by the user start again from an empty map
+    settings = (chunk_size, resolution, view_distance)
+    if settings != _settings or any(name not in bpy.data.objects for name in _objects.values()):
+        for tile in list(_objects):
+            _remove_chunk(tile)
+        _settings = settings
+        _chunked_terrain = ChunkedTerrain(chunk_size=chunk_size, resolution=resolution, view_distance=view_distance)
+    if _material is not None and _material.name not in bpy.data.materials:
+        _material = None
+
+    camera = bpy.context.scene.camera
+    location = tuple(camera.matrix_world.translation) if camera is not None else (0., 0., 0.)
+    removed, changed = _chunked_terrain.update(location)
+
+    for tile in removed:
+        _remove_chunk(tile)
+
+    for tile, (lod, vertices, faces) in changed.items():
+        if tile in _objects:
+            _remove_chunk(tile)
+
+        name = f"map_chunk_{tile[0]}_{tile[1]}"
+        mesh = bpy.data.meshes.new(name + "_mesh")
+        obj = bpy.data.objects.new(name, mesh)
+        bpy.context.collection.objects.link(obj)
+        _objects[tile] = obj.name
+
+        BlenderUtils.fill_mesh(mesh, vertices, faces, smooth=True)
+
+        if _material is None:
+            Materials.NoiseMap(displacement=False).apply_material(obj)
+            _material = obj.data.materials[0]
+        else:
+            mesh.materials.append(_material)
+
+    print(f"Chunked map updated {str(len(changed))} chunks and removed {str(len(removed))} chunks")
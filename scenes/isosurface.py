@@ -1,5 +1,4 @@
 import bpy
-import bmesh
 
 """import utils.BlenderUtils
 from objects.IsoSurfaceGenerator import IsoSurfaceGenerator
@@ -7,11 +6,17 @@ from objects.IsoSurfaceGenerator import *
 """
 
 from BlenderGenerator.utils import BlenderUtils
+from BlenderGenerator.utils.field_cache import FieldCache
 from BlenderGenerator.objects.IsoSurfaceGenerator import IsoSurfaceGenerator
 from BlenderGenerator.objects.IsoSurfaceGenerator import *
 
+# Last generator, its field is reused while the grid parameters are tuned
+_generator = None
+
 
 def isosurface(isosurface_object):
+    global _generator
+
     mesh = bpy.data.meshes.new("isosurface_mesh")  # add a new mesh
     obj = bpy.data.objects.new("isosurface", mesh)  # add a new object using the mesh
 
@@ -22,41 +27,25 @@ def isosurface(isosurface_object):
 
     bpy.data.objects["isosurface"].select_set(True)
     mesh = bpy.context.object.data
-    bm = bmesh.new()
-
-    m = IsoSurfaceGenerator(isosurface_object, bpy.context.scene.grid_size, bpy.context.scene.step_size)
-    m.generate_mesh()
-
-    faces = m.faces()
-    faces_indices = []
-    indices = 0
-    for i in range(0, len(faces)):
-        face_vertices = faces[i]
-
-        bm.verts.new((face_vertices[0].x, face_vertices[0].y, face_vertices[0].z))
-        bm.verts.new((face_vertices[1].x, face_vertices[1].y, face_vertices[1].z))
-        bm.verts.new((face_vertices[2].x, face_vertices[2].y, face_vertices[2].z))
-        indices += 3
-        faces_indices.append([indices, indices-1, indices - 2])
-
-    if hasattr(bm.verts, "ensure_lookup_table"):
-        bm.verts.ensure_lookup_table()
-
-    for i in range(0, len(faces_indices)):
-        v1 = bm.verts[faces_indices[i][0]-1]
-        v2 = bm.verts[faces_indices[i][1]-1]
-        v3 = bm.verts[faces_indices[i][2]-1]
-        bm.faces.new((v1, v2, v3))
-
-    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.00001)
-    bm.normal_update()
-
-    # make the bmesh the object's mesh
-    bm.to_mesh(mesh)
-    bm.free()  # always do this when finished
 
-    values = [True] * len(mesh.polygons)
-    mesh.polygons.foreach_set("use_smooth", values)
+    # An empty directory disables the field cache
+    cache = None
+    if scene.field_cache_directory:
+        cache = FieldCache(bpy.path.abspath(scene.field_cache_directory), scene.field_cache_size * 2 ** 20)
+
+    m = IsoSurfaceGenerator(isosurface_object, bpy.context.scene.grid_size, bpy.context.scene.step_size,
+                            bpy.context.scene.workers, bpy.context.scene.coarse_factor,
+                            bpy.context.scene.extractor.lower(), bpy.context.scene.adaptive_tolerance,
+                            refine_iterations=bpy.context.scene.refine_iterations, cache=cache)
+    if _generator is not None:
+        m.reuse_field(_generator)
+        # Released before the new field is allocated
+        _generator = None
+    m.generate_mesh(streaming=bpy.context.scene.stream_slabs)
+    _generator = m
+
+    # Faces are reversed to face the higher field values, as the field gradient normals
+    BlenderUtils.fill_mesh(mesh, m.vertices(), m.faces()[:, ::-1], smooth=True, normals=m.normals())
 
     bpy.context.view_layer.objects.active = obj
 
@@ -0,0 +1,44 @@
+import bpy
+
+"""
+import utils.BlenderUtils
+from objects.MengerSpongeGenerator import MengerSpongeGenerator
+"""
+
+from BlenderGenerator.utils import BlenderUtils
+from BlenderGenerator.objects.MengerSpongeGenerator import MengerSpongeGenerator, max_iterations
+
+
+def menger_sponge(iterations=5):
+    """
+    Generate the exact Menger sponge
+    :param iterations: iterations of the sponge, limited to max_iterations
+    """
+    if iterations > max_iterations:
+        print(f"Menger sponge limited to {str(max_iterations)} iterations instead of {str(iterations)}")
+        iterations = max_iterations
+
+    mesh = bpy.data.meshes.new("menger_sponge_mesh")  # add a new mesh
+    obj = bpy.data.objects.new("menger_sponge", mesh)  # add a new object using the mesh
+
+    scene = bpy.context.scene
+
+    bpy.context.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj  # set as the active object in the scene
+
+    bpy.data.objects["menger_sponge"].select_set(True)
+    mesh = bpy.context.object.data
+
+    m = MengerSpongeGenerator(iterations)
+    m.generate_mesh()
+
+    BlenderUtils.fill_mesh(mesh, m.vertices(), m.faces(), smooth=False)
+
+    m.material().apply_material(obj)
+
+    bpy.data.objects['Camera'].location = [3, 0, 0]
+    BlenderUtils.update_camera(bpy.data.objects['Camera'],
+                               focus_point=obj.location,
+                               distance=5)
+    scene.render.resolution_x = 1920
+    scene.render.resolution_y = 1920
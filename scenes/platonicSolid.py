@@ -3,8 +3,11 @@
 from BlenderGenerator.objects import PlatonicSolid
 
 
-def platonic_solid(shape):
+def platonic_solid(shape, subdivisions=0, sphere=False):
     """
     Create the five platonic solids
+    :param shape: the shape of the solid
+    :param subdivisions: number of times every triangle is split in four
+    :param sphere: project the vertices on the sphere, for geodesic spheres
     """
-    PlatonicSolid.PlatonicSolid(5, shape)
+    PlatonicSolid.PlatonicSolid(5, shape, subdivisions, sphere)
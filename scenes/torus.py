@@ -1,12 +1,13 @@
 import bpy
-import bmesh
 import mathutils
+import numpy
 
 from BlenderGenerator.utils import BlenderUtils
 from BlenderGenerator.objects.Torus import Torus
+from BlenderGenerator.objects import ParametricSurface
 from BlenderGenerator.objects import Materials
 
-def torus(firstCircleDiameter, secondCircleDiameter):
+def torus(firstCircleDiameter, secondCircleDiameter, tolerance=0.):
     mesh = bpy.data.meshes.new("torus_mesh")  # add a new mesh
     obj = bpy.data.objects.new("torus", mesh)  # add a new object using the mesh
 
@@ -18,36 +19,19 @@ def torus(firstCircleDiameter, secondCircleDiameter):
     bpy.data.objects["torus"].select_set(True)
 
     mesh = bpy.context.object.data
-    bm = bmesh.new()
 
-    t = Torus(mathutils.Vector((0, 0, 0)),
-              firstCircleDiameter,
-              secondCircleDiameter)
-
-    vertices = t.vertices()
-    for v in vertices:
-        bm.verts.new((v.x, v.y, v.z))  # add a new vert
-
-    if hasattr(bm.verts, "ensure_lookup_table"):
-        bm.verts.ensure_lookup_table()
-
-    indices = t.triangles()
-    for i in range(0, len(indices), 3):
-
-        v1 = bm.verts[indices[i]]
-        v2 = bm.verts[indices[i+1]]
-        v3 = bm.verts[indices[i+2]]
-
-        bm.faces.new((v1, v2, v3))
-
-    # Recalculate normal.
-    bm.normal_update()
-
-    # make the bmesh the object's mesh
-    bm.to_mesh(mesh)
-    bm.free()  # always do this when finished
-    values = [True] * len(mesh.polygons)
-    mesh.polygons.foreach_set("use_smooth", values)
+    if tolerance > 0.:
+        # Adaptive sampling, the circles are only split where they are curved
+        t = ParametricSurface.ParametricSurface(ParametricSurface.torus(firstCircleDiameter, secondCircleDiameter),
+                                                wrap_u=True, wrap_v=True, tolerance=tolerance)
+        t.generate_mesh()
+        BlenderUtils.fill_mesh(mesh, t.vertices(), t.faces(), smooth=True)
+    else:
+        t = Torus(mathutils.Vector((0, 0, 0)),
+                  firstCircleDiameter,
+                  secondCircleDiameter)
+
+        BlenderUtils.fill_mesh(mesh, t.vertices(), numpy.array(t.triangles()).reshape(-1, 3), smooth=True)
 
     Materials.SmoothColor((0., 0., 0., 0.)).apply_material(obj)
     bpy.data.objects['Camera'].location = [0, 0, 10]
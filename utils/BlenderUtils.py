@@ -1,5 +1,6 @@
 import bpy
 import mathutils
+import numpy
 
 
 def update_camera(camera, focus_point=mathutils.Vector((0.0, 0.0, 0.0)), distance=10.0):
@@ -19,3 +20,48 @@ def update_camera(camera, focus_point=mathutils.Vector((0.0, 0.0, 0.0)), distanc
 
     camera.rotation_euler = rot_quat.to_euler()
     camera.location = rot_quat @ mathutils.Vector((0.0, 0.0, distance))
+
+
+def fill_mesh(mesh, vertices, faces, smooth=True, normals=None):
+    """
+    Fill an empty mesh with vertices and faces in bulk, without going through bmesh
+
+    :param mesh: the mesh to fill
+    :type mesh: bpy.types.Mesh
+    :param vertices: the vertices, of shape (n, 3)
+    :param faces: the vertex indices of each face, an array of shape (m, k) or a list of sequences of any length
+    :param smooth: shade the faces smooth (default=``True``)
+    :type smooth: bool
+    :param normals: optional custom normals of the vertices, of shape (n, 3)
+    :return: the mesh
+    """
+    vertices = numpy.asarray(vertices, dtype=numpy.float32).reshape(-1, 3)
+    if isinstance(faces, numpy.ndarray) and faces.ndim == 2:
+        loop_totals = numpy.full(len(faces), faces.shape[1], dtype=numpy.int32)
+        loops = faces.ravel()
+    else:
+        loop_totals = numpy.array([len(face) for face in faces], dtype=numpy.int32)
+        loops = numpy.fromiter((index for face in faces for index in face), dtype=numpy.int32,
+                               count=int(loop_totals.sum()))
+    loop_starts = numpy.zeros(len(loop_totals), dtype=numpy.int32)
+    numpy.cumsum(loop_totals[:-1], out=loop_starts[1:])
+
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", vertices.ravel())
+    mesh.loops.add(len(loops))
+    mesh.loops.foreach_set("vertex_index", numpy.asarray(loops, dtype=numpy.int32))
+    mesh.polygons.add(len(loop_totals))
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    if bpy.app.version < (4, 0, 0):
+        # Deduced from the loop starts since Blender 4.0
+        mesh.polygons.foreach_set("loop_total", loop_totals)
+    mesh.polygons.foreach_set("use_smooth", numpy.full(len(loop_totals), smooth, dtype=bool))
+
+    mesh.update(calc_edges=True)
+
+    if normals is not None:
+        if hasattr(mesh, "use_auto_smooth"):
+            mesh.use_auto_smooth = True
+        mesh.normals_split_custom_set_from_vertices(numpy.asarray(normals, dtype=numpy.float32).tolist())
+
+    return mesh
@@ -0,0 +1,136 @@
+import numpy
+
+from BlenderGenerator.utils import marching_cubes
+
+
+def edge_crossings(field, origin, step, iso_level, function=None, iterations=0):
+    """
+    Compute the crossing point of every grid edge crossed by the isosurface
+    :param field: 3D array of the field values, indexed by [x, y, z]
+    :param origin: Position of the point field[0, 0, 0]
+    :param step: The step size of the grid
+    :param iso_level: The isovalue
+    :param function: Function computing the field values of an array of points, used to refine the crossings
+    :param iterations: Number of crossing refinement iterations
+    :return: Vertex indices of the x, y and z edges as returned by marching_cubes.edge_vertices and the
+    array of the crossing points
+    """
+    edge_indices = []
+    points = []
+    for axis in range(0, 3):
+        indices, axis_points = marching_cubes.edge_vertices(field, axis, origin, step, iso_level,
+                                                            sum(len(p) for p in points), function=function,
+                                                            iterations=iterations)
+        edge_indices.append(indices)
+        points.append(axis_points)
+    return edge_indices, numpy.concatenate(points)
+
+
+def cell_quads(field, iso_level, edge_indices, cell_vertices):
+    """
+    Emit one quad around each crossed grid edge, linking the vertices of the 4 cells sharing it
+    :param field: 3D array of the field values, indexed by [x, y, z]
+    :param iso_level: The isovalue
+    :param edge_indices: Vertex indices of the x, y and z edges as returned by marching_cubes.edge_vertices
+    :param cell_vertices: 3D array of the vertex index of each cell
+    :return: Array of shape (n, 4) of the quads vertex indices
+    """
+    quads = []
+    for axis in range(0, 3):
+        b, c = (axis + 1) % 3, (axis + 2) % 3
+
+        # Only the edges inside the grid have 4 cells around them
+        inner = [slice(None)] * 3
+        inner[b] = slice(1, field.shape[b] - 1)
+        inner[c] = slice(1, field.shape[c] - 1)
+        edges = numpy.argwhere(edge_indices[axis][tuple(inner)] >= 0)
+        edges[:, b] += 1
+        edges[:, c] += 1
+
+        # Cells counterclockwise around the axis
+        around = []
+        for db, dc in ((-1, -1), (0, -1), (0, 0), (-1, 0)):
+            cell = edges.copy()
+            cell[:, b] += db
+            cell[:, c] += dc
+            around.append(cell_vertices[cell[:, 0], cell[:, 1], cell[:, 2]])
+        axis_quads = numpy.stack(around, axis=1)
+
+        # Quads face the lower field values, as marching cubes triangles
+        below = field[edges[:, 0], edges[:, 1], edges[:, 2]] < iso_level
+        axis_quads[below] = axis_quads[below, ::-1]
+        quads.append(axis_quads)
+    return numpy.concatenate(quads)
+
+
+def _dual_mesh(field, origin, step, iso_level, gradient=None, function=None, iterations=0):
+    """
+    Compute the vertex of each cell crossed by the isosurface and the quads linking them
+    """
+    field = numpy.asarray(field, dtype=numpy.float64)
+    edge_indices, points = edge_crossings(field, origin, step, iso_level, function, iterations)
+
+    cube_index = marching_cubes.cube_indices(field, iso_level)
+    cells = numpy.flatnonzero(marching_cubes.edge_table_array[cube_index])
+    cell_coordinates = numpy.unravel_index(cells, cube_index.shape)
+    vert_list = marching_cubes.cell_edge_indices(cell_coordinates, edge_indices)
+    crossed = vert_list >= 0
+
+    # Mass point of the crossing points of each cell
+    cell_points = points[vert_list] * crossed[..., None]
+    vertices = cell_points.sum(axis=1) / crossed.sum(axis=1)[:, None]
+
+    if gradient is not None and len(points):
+        # Point minimizing the distance to the tangent planes at the crossing points, solved around the
+        # mass point with the small eigenvalues dropped
+        normals = numpy.asarray(gradient(points), dtype=numpy.float64)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            normals = normals / numpy.linalg.norm(normals, axis=1)[:, None]
+        normals = numpy.nan_to_num(normals, nan=0., posinf=0., neginf=0.)
+        cell_normals = normals[vert_list] * crossed[..., None]
+        distances = numpy.einsum('nki,nki->nk', cell_normals, cell_points - vertices[:, None, :])
+        ata = numpy.einsum('nki,nkj->nij', cell_normals, cell_normals)
+        atb = numpy.einsum('nki,nk->ni', cell_normals, distances)
+        eigenvalues, eigenvectors = numpy.linalg.eigh(ata)
+        inverse = numpy.where(eigenvalues > 0.1, 1. / numpy.maximum(eigenvalues, 0.1), 0.)
+        solution = numpy.einsum('nij,nj,nkj,nk->ni', eigenvectors, inverse, eigenvectors, atb)
+
+        # Keep the vertices in their cell
+        lower = numpy.asarray(origin, dtype=numpy.float64) + numpy.stack(cell_coordinates, axis=1) * step
+        vertices = numpy.clip(vertices + solution, lower, lower + step)
+
+    cell_vertices = numpy.full(cube_index.shape, -1, dtype=numpy.int64)
+    cell_vertices.ravel()[cells] = numpy.arange(len(cells))
+    return vertices, cell_quads(field, iso_level, edge_indices, cell_vertices)
+
+
+def surface_nets(field, origin, step, iso_level, function=None, iterations=0):
+    """
+    Compute the mesh of a whole grid with naive surface nets. Each cell crossed by the isosurface gives a
+    vertex at the mean of its edge crossing points, and each crossed edge a quad.
+    :param field: 3D array of the field values, indexed by [x, y, z]
+    :param origin: Position of the point field[0, 0, 0]
+    :param step: The step size of the grid
+    :param iso_level: The isovalue
+    :param function: Function computing the field values of an array of points, used to refine the crossings
+    :param iterations: Number of crossing refinement iterations
+    :return: Array of shape (n, 3) of the vertices and array of shape (m, 4) of the quads vertex indices
+    """
+    return _dual_mesh(field, origin, step, iso_level, function=function, iterations=iterations)
+
+
+def dual_contouring(field, origin, step, iso_level, gradient, function=None, iterations=0):
+    """
+    Compute the mesh of a whole grid with dual contouring. Each cell crossed by the isosurface gives a
+    vertex minimizing its distance to the tangent planes at its edge crossing points, which keeps sharp
+    features, and each crossed edge a quad.
+    :param field: 3D array of the field values, indexed by [x, y, z]
+    :param origin: Position of the point field[0, 0, 0]
+    :param step: The step size of the grid
+    :param iso_level: The isovalue
+    :param gradient: Function computing the field gradient of an array of points of shape (n, 3)
+    :param function: Function computing the field values of an array of points, used to refine the crossings
+    :param iterations: Number of crossing refinement iterations
+    :return: Array of shape (n, 3) of the vertices and array of shape (m, 4) of the quads vertex indices
+    """
+    return _dual_mesh(field, origin, step, iso_level, gradient, function, iterations)
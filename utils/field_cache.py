@@ -0,0 +1,104 @@
+import hashlib
+import os
+
+import numpy
+
+# Version of the field evaluation code, increased whenever a change of the isosurfaces alters the sampled
+# values, so that the grids cached by older versions are not loaded back
+field_version = 2
+
+
+class FieldCache:
+    """
+    Store sampled field grids on disk as .npy files, loaded as memory maps. The least recently used
+    grids are removed when the cache is larger than its size limit.
+    """
+    def __init__(self, directory, max_bytes=2 ** 30):
+        """
+
+        :param directory: The directory of the cache files, created if needed
+        :param max_bytes: Largest total size of the cache files
+        """
+        self.__directory = directory
+        self.__max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(signature, low, step, count, backend='numpy'):
+        """
+        Compute the stable key of a sampled grid
+        :param signature: The signature of the isosurface
+        :param low: The coordinate of the first grid point on each axis
+        :param step: The step size of the grid
+        :param count: The number of grid points per axis
+        :param backend: The code evaluating the field, 'numpy' or 'numba'
+        :return: Hexadecimal digest of the field code, of the surface and of the lattice
+        """
+        description = repr((field_version, backend, signature, float(low), float(step), int(count)))
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+    def __path(self, key):
+        return os.path.join(self.__directory, key + '.npy')
+
+    def load(self, key):
+        """
+        Open a cached field grid, its values are only read from the disk when they are used
+        :param key: The key of the grid
+        :return: Read-only memory map of the grid, None if the grid is not cached
+        """
+        path = self.__path(key)
+        try:
+            field = numpy.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+
+        # The modification time orders the files from the least recently used
+        os.utime(path)
+        return field
+
+    def store(self, key, field):
+        """
+        Write a field grid in the cache, then remove the least recently used grids above the size limit
+        :param key: The key of the grid
+        :param field: The field grid
+        """
+        if field.nbytes > self.__max_bytes:
+            return
+
+        path = self.__path(key)
+        # Written under another name first, another process never opens an incomplete file
+        temporary = path + '.' + str(os.getpid()) + '.tmp'
+        with open(temporary, 'wb') as file:
+            numpy.save(file, field)
+        os.replace(temporary, path)
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used grids until the cache fits in its size limit
+        """
+        files = []
+        for entry in os.scandir(self.__directory):
+            if entry.is_file() and entry.name.endswith('.npy'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.__max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """
+        Remove every cached grid
+        """
+        for entry in os.scandir(self.__directory):
+            if entry.is_file() and entry.name.endswith('.npy'):
+                os.remove(entry.path)
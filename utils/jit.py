@@ -0,0 +1,319 @@
+import math
+import os
+import numpy
+
+# Compiled kernels, only available when Numba is installed. Every kernel computes the same values as
+# the NumPy version it replaces, one point or one cell at a time.
+try:
+    import numba
+except ImportError:
+    numba = None
+
+available = numba is not None
+
+# The field is evaluated in forked worker processes, the default TBB threading layer is not fork-safe and
+# hangs the interpreter at exit once a parallel kernel ran before the fork
+if available and "NUMBA_THREADING_LAYER" not in os.environ:
+    numba.config.THREADING_LAYER = 'workqueue'
+
+if available:
+    @numba.njit(cache=True, parallel=True)
+    def cube_indices(field, iso_level):
+        """
+        Compute the edge table index of every cell of a grid
+        :param field: 3D array of the field values, indexed by [x, y, z]
+        :param iso_level: The isovalue
+        :return: 3D array of uint8 with one index per cell
+        """
+        nx, ny, nz = field.shape
+        cube_index = numpy.zeros((nx - 1, ny - 1, nz - 1), dtype=numpy.uint8)
+        for i in numba.prange(nx - 1):
+            for j in range(ny - 1):
+                for k in range(nz - 1):
+                    index = 0
+                    if field[i, j, k + 1] < iso_level:
+                        index |= 1
+                    if field[i + 1, j, k + 1] < iso_level:
+                        index |= 2
+                    if field[i + 1, j, k] < iso_level:
+                        index |= 4
+                    if field[i, j, k] < iso_level:
+                        index |= 8
+                    if field[i, j + 1, k + 1] < iso_level:
+                        index |= 16
+                    if field[i + 1, j + 1, k + 1] < iso_level:
+                        index |= 32
+                    if field[i + 1, j + 1, k] < iso_level:
+                        index |= 64
+                    if field[i, j + 1, k] < iso_level:
+                        index |= 128
+                    cube_index[i, j, k] = index
+        return cube_index
+
+    @numba.njit(cache=True)
+    def _interpolate(origin, coordinate, d, step, mu):
+        p1 = origin + coordinate * step
+        p2 = origin + (coordinate + d) * step
+        return p1 + (p2 - p1) * mu
+
+    @numba.njit(cache=True, parallel=True)
+    def edge_vertices(field, axis, origin, step, iso_level, first_index, offset):
+        """
+        Compute one linearly interpolated vertex for each grid edge along an axis crossed by the isosurface
+        :param field: 3D array of the field values, indexed by [x, y, z]
+        :param axis: Axis of the edges (0 for x, 1 for y, 2 for z)
+        :param origin: Array of the position of the point field[0, 0, 0]
+        :param step: The step size of the grid
+        :param iso_level: The isovalue
+        :param first_index: Index given to the first vertex
+        :param offset: Array of the grid coordinates of the point field[0, 0, 0]
+        :return: Array of the vertex index of each edge (-1 if the edge is not crossed) and array of the vertices
+        """
+        dx, dy, dz = int(axis == 0), int(axis == 1), int(axis == 2)
+        nx, ny, nz = field.shape[0] - dx, field.shape[1] - dy, field.shape[2] - dz
+
+        # Number of crossed edges of each x slice, the vertices are numbered slice after slice
+        starts = numpy.zeros(nx + 1, dtype=numpy.int64)
+        for i in numba.prange(nx):
+            count = 0
+            for j in range(ny):
+                for k in range(nz):
+                    if (field[i, j, k] < iso_level) != (field[i + dx, j + dy, k + dz] < iso_level):
+                        count += 1
+            starts[i + 1] = count
+        starts = numpy.cumsum(starts)
+
+        indices = numpy.full((nx, ny, nz), -1, dtype=numpy.int64)
+        vertices = numpy.empty((starts[nx], 3))
+        for i in numba.prange(nx):
+            n = starts[i]
+            for j in range(ny):
+                for k in range(nz):
+                    valp1 = field[i, j, k]
+                    valp2 = field[i + dx, j + dy, k + dz]
+                    if (valp1 < iso_level) == (valp2 < iso_level):
+                        continue
+
+                    # Same operations as linear_vertices_interpolation
+                    delta = valp2 - valp1
+                    mu = 0.
+                    if not abs(abs(delta) - 0.00001) <= 0.00001 + 0.00001 * 0.00001:
+                        mu = (iso_level - valp1) / delta
+                    vertices[n, 0] = _interpolate(origin[0], numpy.int64(i) + offset[0], dx, step, mu)
+                    vertices[n, 1] = _interpolate(origin[1], numpy.int64(j) + offset[1], dy, step, mu)
+                    vertices[n, 2] = _interpolate(origin[2], numpy.int64(k) + offset[2], dz, step, mu)
+                    indices[i, j, k] = first_index + n
+                    n += 1
+        return indices, vertices
+
+    @numba.njit(cache=True, parallel=True)
+    def cell_faces(cube_index, x_indices, y_indices, z_indices, tri_table, edge_axes, edge_offsets):
+        """
+        Compute the triangles of every cell from the vertex index of the grid edges
+        :param cube_index: 3D array of the edge table index of each cell
+        :param x_indices: Vertex indices of the x edges as returned by edge_vertices
+        :param y_indices: Vertex indices of the y edges
+        :param z_indices: Vertex indices of the z edges
+        :param tri_table: Array of the triangle table, each row ends with -1
+        :param edge_axes: Array of the axis of each cell edge
+        :param edge_offsets: Array of shape (12, 3) of the lower corner of each cell edge
+        :return: Array of shape (n, 3) with the vertex indices of each triangle
+        """
+        nx, ny, nz = cube_index.shape
+
+        # Number of triangle corners of each x slice, the triangles are emitted slice after slice
+        starts = numpy.zeros(nx + 1, dtype=numpy.int64)
+        for i in numba.prange(nx):
+            count = 0
+            for j in range(ny):
+                for k in range(nz):
+                    t = 0
+                    while tri_table[cube_index[i, j, k], t] != -1:
+                        t += 1
+                    count += t
+            starts[i + 1] = count
+        starts = numpy.cumsum(starts)
+
+        faces = numpy.empty(starts[nx], dtype=numpy.int64)
+        for i in numba.prange(nx):
+            n = starts[i]
+            for j in range(ny):
+                for k in range(nz):
+                    case = cube_index[i, j, k]
+                    t = 0
+                    while tri_table[case, t] != -1:
+                        edge = tri_table[case, t]
+                        x = i + edge_offsets[edge, 0]
+                        y = j + edge_offsets[edge, 1]
+                        z = k + edge_offsets[edge, 2]
+                        if edge_axes[edge] == 0:
+                            faces[n] = x_indices[x, y, z]
+                        elif edge_axes[edge] == 1:
+                            faces[n] = y_indices[x, y, z]
+                        else:
+                            faces[n] = z_indices[x, y, z]
+                        n += 1
+                        t += 1
+        return faces.reshape(-1, 3)
+
+    @numba.njit(cache=True)
+    def _box(x, y, z, bx, by, bz):
+        dx = abs(x) - bx
+        dy = abs(y) - by
+        dz = abs(z) - bz
+        outside = math.sqrt(max(dx, 0.) ** 2 + max(dy, 0.) ** 2 + max(dz, 0.) ** 2)
+        return min(max(dx, max(dy, dz)), 0.) + outside
+
+    @numba.njit(cache=True, parallel=True)
+    def menger_sponge(points, iterations):
+        """
+        Compute the MengerSponge field of several points
+        :param points: Array of shape (n, 3) of the points
+        :param iterations: The number of holes iterations
+        :return: Array of shape (n,) of the field values
+        """
+        result = numpy.empty(len(points))
+        for n in numba.prange(len(points)):
+            x, y, z = points[n, 0], points[n, 1], points[n, 2]
+            hole_width_b = 2. / 3.
+            menger = _box(x, y, z, 2., 2., 2.)
+            for i in range(iterations):
+                hole_distance = hole_width_b * 6.
+                qx = x + hole_width_b - hole_distance * math.floor((x + hole_width_b) / hole_distance) - hole_width_b
+                qy = y + hole_width_b - hole_distance * math.floor((y + hole_width_b) / hole_distance) - hole_width_b
+                qz = z + hole_width_b - hole_distance * math.floor((z + hole_width_b) / hole_distance) - hole_width_b
+
+                hole_x = _box(qx, qy, qz, 1., hole_width_b, hole_width_b)
+                hole_y = _box(qx, qy, qz, hole_width_b, 1., hole_width_b)
+                hole_z = _box(qx, qy, qz, hole_width_b, hole_width_b, 1.)
+
+                hole_width_b = hole_width_b / 3.
+                menger = max(max(max(menger, -hole_x), -hole_y), -hole_z)
+            result[n] = menger
+        return result
+
+    @numba.njit(cache=True, parallel=True)
+    def mandelbulb(points, max_iterations, degree):
+        """
+        Compute the Mandelbulb escape value of several points, each point stops at its own escape
+        :param points: Array of shape (n, 3) of the points
+        :param max_iterations: The maximum number of iterations
+        :param degree: The power of the Mandelbulb
+        :return: Array of shape (n,) of the field values
+        """
+        result = numpy.zeros(len(points))
+        for n in numba.prange(len(points)):
+            x, y, z = points[n, 0], points[n, 1], points[n, 2]
+            for ite in range(max_iterations):
+                r = math.sqrt(x * x + y * y + z * z)
+                theta = math.atan2(math.sqrt(x * x + y * y), z)
+                phi = math.atan2(y, x)
+                p = math.pow(r, degree)
+                x, y, z = (p * math.sin(theta * degree) * math.cos(phi * degree) + x,
+                           p * math.sin(theta * degree) * math.sin(phi * degree) + y,
+                           p * math.cos(theta * degree) + z)
+
+                result[n] = math.sqrt(x * x + y * y + z * z)
+                if not result[n] <= 1:
+                    break
+        return result
+
+    @numba.njit(cache=True)
+    def _complex_power(real, imag, degree):
+        result_real = 1.
+        result_imag = 0.
+        while degree:
+            if degree & 1:
+                result_real, result_imag = (result_real * real - result_imag * imag,
+                                            result_real * imag + result_imag * real)
+            degree >>= 1
+            if degree:
+                real, imag = real * real - imag * imag, 2. * real * imag
+        return result_real, result_imag
+
+    @numba.njit(cache=True, parallel=True)
+    def mandelbulb_triplex(points, max_iterations, degree):
+        """
+        Compute the Mandelbulb escape value of several points for an integer degree, with the triplex
+        algebra instead of trigonometry
+        :param points: Array of shape (n, 3) of the points
+        :param max_iterations: The maximum number of iterations
+        :param degree: The power of the Mandelbulb, a positive integer
+        :return: Array of shape (n,) of the field values
+        """
+        result = numpy.zeros(len(points))
+        for n in numba.prange(len(points)):
+            x, y, z = points[n, 0], points[n, 1], points[n, 2]
+            for ite in range(max_iterations):
+                rho = math.sqrt(x * x + y * y)
+                polar_real, polar_imag = _complex_power(z, rho, degree)
+                if rho > 0.:
+                    azimuth_real, azimuth_imag = _complex_power(x / rho, y / rho, degree)
+                else:
+                    azimuth_real, azimuth_imag = 1., 0.
+                x, y, z = (polar_imag * azimuth_real + x,
+                           polar_imag * azimuth_imag + y,
+                           polar_real + z)
+
+                result[n] = math.sqrt(x * x + y * y + z * z)
+                if not result[n] <= 1:
+                    break
+        return result
+
+    @numba.njit(cache=True, parallel=True)
+    def mandelbox(points, scale, iterations):
+        """
+        Compute the Mandelbox distance estimation of several points
+        :param points: Array of shape (n, 3) of the points
+        :param scale: The scale of the Mandelbox
+        :param iterations: The number of folds
+        :return: Array of shape (n,) of the field values
+        """
+        fr2 = 1.
+        mr2 = 0.25
+        result = numpy.empty(len(points))
+        for n in numba.prange(len(points)):
+            x, y, z = points[n, 0], points[n, 1], points[n, 2]
+            de_factor = scale
+            for i in range(iterations):
+                de_factor = scale
+
+                # Box fold
+                if x > 1.0:
+                    x = 2.0 - x
+                elif x < -1.0:
+                    x = -2.0 - x
+                if y > 1.0:
+                    y = 2.0 - y
+                elif y < -1.0:
+                    y = -2.0 - y
+                if z > 1.0:
+                    z = 2.0 - z
+                elif z < -1.0:
+                    z = -2.0 - z
+
+                # Sphere fold
+                r2 = x * x + y * y + z * z
+                if r2 < mr2:
+                    x = x * fr2 / mr2
+                    y = y * fr2 / mr2
+                    z = z * fr2 / mr2
+                    de_factor = de_factor * fr2 / mr2
+                elif r2 < fr2:
+                    x = x * fr2 / r2
+                    y = y * fr2 / r2
+                    z = z * fr2 / r2
+                    de_factor = de_factor * fr2 / r2
+
+                x = x * scale + 2
+                y = y * scale + -2
+                z = z * scale + -2
+                de_factor = de_factor * scale
+            result[n] = math.sqrt(x * x + y * y + z * z) / abs(de_factor)
+        return result
+else:
+    cube_indices = None
+    menger_sponge = None
+    mandelbulb = None
+    mandelbulb_triplex = None
+    mandelbox = None
@@ -1,6 +1,10 @@
 import mathutils
 import math
 
+import numpy
+
+from BlenderGenerator.utils import jit
+
 # Edge table for marching cubes
 edge_table = [
     0x0  , 0x109, 0x203, 0x30a, 0x406, 0x50f, 0x605, 0x70c,
@@ -296,6 +300,27 @@ tri_table = [
     [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1]
 ]
 
+# Tables as arrays for the vectorized marching cubes
+edge_table_array = numpy.array(edge_table, dtype=numpy.int32)
+tri_table_array = numpy.array(tri_table, dtype=numpy.int8)
+
+# Offset of each cell corner in the grid, in the order used by GridCell vertices
+corner_offsets = numpy.array([
+    [0, 0, 1], [1, 0, 1], [1, 0, 0], [0, 0, 0],
+    [0, 1, 1], [1, 1, 1], [1, 1, 0], [0, 1, 0]
+])
+
+# Corners linked by each edge, the lower corner of the grid first
+edge_corners = numpy.array([
+    [0, 1], [2, 1], [3, 2], [3, 0],
+    [4, 5], [6, 5], [7, 6], [7, 4],
+    [0, 4], [1, 5], [2, 6], [3, 7]
+])
+
+# Axis and lower corner of each edge
+edge_axes = numpy.argmax(corner_offsets[edge_corners[:, 1]] - corner_offsets[edge_corners[:, 0]], axis=1)
+edge_offsets = corner_offsets[edge_corners[:, 0]]
+
 
 class GridCell:
     """
@@ -491,3 +516,651 @@ def marching_cubes(grid_cell, iso_level):
 
     return triangles
 
+
+
+def linear_vertices_interpolation(iso_level, p1, p2, valp1, valp2):
+    """
+    Vectorized version of linear_vertex_interpolation, p1 has to be the lower point of each edge
+    :param iso_level: The isovalue
+    :param p1: Array of points number 1, of shape (..., 3)
+    :param p2: Array of points number 2, of shape (..., 3)
+    :param valp1: p1 distances with the isosurface, of shape (...)
+    :param valp2: p2 distances with the isosurface, of shape (...)
+    :return: Array of the interpolated points
+    """
+    delta = valp2 - valp1
+    flat = numpy.isclose(numpy.abs(delta), 0.00001, rtol=0.00001, atol=0.00001)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        mu = numpy.where(flat, 0., (iso_level - valp1) / numpy.where(flat, 1., delta))
+    return p1 + (p2 - p1) * mu[..., None]
+
+
+def refine_roots(function, iso_level, p1, p2, valp1, valp2, iterations):
+    """
+    Move the vertices of crossed edges closer to the isosurface with regula falsi iterations, the Illinois
+    variant halving the value of an end kept twice in a row. All the edges are refined together.
+    :param function: Function computing the field values of an array of points of shape (n, 3)
+    :param iso_level: The isovalue
+    :param p1: Array of shape (n, 3) of the points number 1
+    :param p2: Array of shape (n, 3) of the points number 2
+    :param valp1: p1 field values
+    :param valp2: p2 field values
+    :param iterations: Number of field evaluations per edge
+    :return: Array of shape (n, 3) of the refined points
+    """
+    lower = numpy.zeros(len(p1))
+    upper = numpy.ones(len(p1))
+    lower_value = numpy.asarray(valp1, dtype=numpy.float64) - iso_level
+    upper_value = numpy.asarray(valp2, dtype=numpy.float64) - iso_level
+    kept = numpy.zeros(len(p1), dtype=numpy.int8)
+
+    def position():
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            mu = lower - lower_value * (upper - lower) / (upper_value - lower_value)
+        return numpy.where(numpy.isfinite(mu), mu, (lower + upper) / 2)
+
+    for i in range(0, iterations):
+        mu = position()
+        value = function(p1 + (p2 - p1) * mu[:, None]) - iso_level
+
+        # Undefined values count as above the isovalue, the next point is then the middle
+        replace_lower = (value < 0) == (lower_value < 0)
+        upper_value = numpy.where(replace_lower & (kept == 1), upper_value * 0.5, upper_value)
+        lower_value = numpy.where(~replace_lower & (kept == -1), lower_value * 0.5, lower_value)
+        lower = numpy.where(replace_lower, mu, lower)
+        lower_value = numpy.where(replace_lower, value, lower_value)
+        upper = numpy.where(replace_lower, upper, mu)
+        upper_value = numpy.where(replace_lower, upper_value, value)
+        kept = numpy.where(replace_lower, 1, -1).astype(numpy.int8)
+
+    return p1 + (p2 - p1) * position()[:, None]
+
+
+def field_gradients(field, origin, step, points):
+    """
+    Compute the field gradient of points from the grid, by trilinear interpolation of the central
+    differences at the corners of their cell
+    :param field: 3D array of the field values, indexed by [x, y, z]
+    :param origin: Position of the point field[0, 0, 0]
+    :param step: The step size of the grid
+    :param points: Array of shape (n, 3) of the points
+    :return: Array of shape (n, 3) of the gradients
+    """
+    shape = numpy.array(field.shape)
+    coordinates = (numpy.asarray(points, dtype=numpy.float64) - origin) / step
+    cells = numpy.clip(numpy.floor(coordinates).astype(numpy.int64), 0, shape - 2)
+    t = coordinates - cells
+
+    gradients = numpy.zeros((len(cells), 3))
+    for offset in corner_offsets:
+        corner = cells + offset
+        weight = numpy.prod(numpy.where(offset == 1, t, 1 - t), axis=1)
+        for axis in range(0, 3):
+            upper = corner.copy()
+            lower = corner.copy()
+            upper[:, axis] = numpy.minimum(corner[:, axis] + 1, shape[axis] - 1)
+            lower[:, axis] = numpy.maximum(corner[:, axis] - 1, 0)
+            difference = field[upper[:, 0], upper[:, 1], upper[:, 2]] - field[lower[:, 0], lower[:, 1], lower[:, 2]]
+            gradients[:, axis] += weight * difference / ((upper[:, axis] - lower[:, axis]) * step)
+    return gradients
+
+
+def cube_indices(field, iso_level):
+    """
+    Compute the edge table index of every cell of a grid
+    :param field: 3D array of the field values, indexed by [x, y, z]
+    :param iso_level: The isovalue
+    :return: 3D array of uint8 with one index per cell
+    """
+    if jit.available:
+        return jit.cube_indices(field, iso_level)
+
+    nx, ny, nz = field.shape
+    cube_index = numpy.zeros((nx - 1, ny - 1, nz - 1), dtype=numpy.uint8)
+    for corner, (dx, dy, dz) in enumerate(corner_offsets):
+        below = field[dx:nx - 1 + dx, dy:ny - 1 + dy, dz:nz - 1 + dz] < iso_level
+        cube_index |= below.view(numpy.uint8) << numpy.uint8(corner)
+    return cube_index
+
+
+def edge_vertices(field, axis, origin, step, iso_level, first_index=0, offset=(0, 0, 0), function=None,
+                  iterations=0):
+    """
+    Compute one vertex for each grid edge along an axis crossed by the isosurface
+    :param field: 3D array of the field values, indexed by [x, y, z]
+    :param axis: Axis of the edges (0 for x, 1 for y, 2 for z)
+    :param origin: Position of the point field[0, 0, 0]
+    :param step: The step size of the grid
+    :param iso_level: The isovalue
+    :param first_index: Index given to the first vertex
+    :param offset: Grid coordinates of the point field[0, 0, 0] when the field is a part of the grid
+    :param function: Function computing the field values of an array of points of shape (n, 3), used to
+    refine the vertices
+    :param iterations: Number of refinement iterations, 0 to keep the linear interpolation
+    :return: Array of the vertex index of each edge (-1 if the edge is not crossed) and array of the vertices
+    """
+    if jit.available and (function is None or iterations <= 0):
+        return jit.edge_vertices(numpy.asarray(field, dtype=numpy.float64), axis,
+                                 numpy.asarray(origin, dtype=numpy.float64), float(step), float(iso_level),
+                                 first_index, numpy.asarray(offset, dtype=numpy.int64))
+
+    lower_slice = [slice(None)] * 3
+    upper_slice = [slice(None)] * 3
+    lower_slice[axis] = slice(0, field.shape[axis] - 1)
+    upper_slice[axis] = slice(1, field.shape[axis])
+    lower = field[tuple(lower_slice)]
+    upper = field[tuple(upper_slice)]
+
+    crossed = (lower < iso_level) != (upper < iso_level)
+    edges = numpy.flatnonzero(crossed)
+    indices = numpy.full(crossed.shape, -1, dtype=numpy.int64)
+    indices.ravel()[edges] = numpy.arange(first_index, first_index + len(edges))
+
+    lower_coordinates = numpy.stack(numpy.unravel_index(edges, crossed.shape), axis=1) + offset
+    upper_coordinates = lower_coordinates.copy()
+    upper_coordinates[:, axis] += 1
+
+    origin = numpy.asarray(origin, dtype=numpy.float64)
+    if function is not None and iterations > 0:
+        vertices = refine_roots(function, iso_level, origin + lower_coordinates * step,
+                                origin + upper_coordinates * step, lower[crossed], upper[crossed], iterations)
+    else:
+        vertices = linear_vertices_interpolation(iso_level,
+                                                 origin + lower_coordinates * step, origin + upper_coordinates * step,
+                                                 lower[crossed], upper[crossed])
+    return indices, vertices
+
+
+def cell_faces(cube_index, edge_indices):
+    """
+    Compute the triangles of every cell from the vertex index of the grid edges
+    :param cube_index: 3D array of the edge table index of each cell
+    :param edge_indices: Vertex indices of the x, y and z edges as returned by edge_vertices
+    :return: Array of shape (n, 3) with the vertex indices of each triangle
+    """
+    if jit.available:
+        return jit.cell_faces(cube_index, edge_indices[0], edge_indices[1], edge_indices[2], tri_table_array,
+                              edge_axes, edge_offsets)
+
+    cells = numpy.flatnonzero(edge_table_array[cube_index])
+    vert_list = cell_edge_indices(numpy.unravel_index(cells, cube_index.shape), edge_indices)
+    return table_faces(cube_index.ravel()[cells], vert_list)[0]
+
+
+def cell_edge_indices(cell_coordinates, edge_indices):
+    """
+    Gather the vertex index of the 12 edges of cells
+    :param cell_coordinates: Tuple of the x, y and z arrays of the grid coordinates of the cells
+    :param edge_indices: Vertex indices of the x, y and z edges as returned by edge_vertices
+    :return: Array of shape (n, 12) of the vertex indices, -1 for the edges not crossed
+    """
+    vert_list = numpy.empty((len(cell_coordinates[0]), 12), dtype=numpy.int64)
+    for edge, (c1, c2) in enumerate(edge_corners):
+        axis = numpy.argmax(corner_offsets[c2] - corner_offsets[c1])
+        offset = corner_offsets[c1]
+        vert_list[:, edge] = edge_indices[axis][cell_coordinates[0] + offset[0],
+                                                cell_coordinates[1] + offset[1],
+                                                cell_coordinates[2] + offset[2]]
+    return vert_list
+
+
+def table_faces(cube_index, vert_list):
+    """
+    Compute the triangles of several cells from the triangle table
+    :param cube_index: Array of the edge table index of each cell
+    :param vert_list: Array of shape (n, 12) of the vertex index of the edges of each cell
+    :return: Array of shape (m, 3) with the vertex indices of each triangle and array of the cell of each triangle
+    """
+    triangles = tri_table_array[cube_index]
+    used = triangles != -1
+    triangle_cells = numpy.repeat(numpy.arange(len(cube_index)), used.sum(axis=1))
+    return vert_list[triangle_cells, triangles[used]].reshape(-1, 3), triangle_cells[::3]
+
+
+def marching_cubes_mesh(field, origin, step, iso_level, function=None, iterations=0):
+    """
+    Compute the mesh of a whole grid at once. Each grid edge crossed by the isosurface gives a single
+    vertex shared by all the triangles using it.
+    Triangles are emitted in the same order as calling marching_cubes on every cell with x as the outer
+    loop and z as the inner one.
+    :param field: 3D array of the field values, indexed by [x, y, z]
+    :param origin: Position of the point field[0, 0, 0]
+    :param step: The step size of the grid
+    :param iso_level: The isovalue
+    :param function: Function computing the field values of an array of points, used to refine the vertices
+    :param iterations: Number of vertex refinement iterations
+    :return: Array of shape (n, 3) of the vertices and array of shape (m, 3) of the triangles vertex indices
+    """
+    field = numpy.asarray(field, dtype=numpy.float64)
+
+    edge_indices = []
+    vertices = []
+    for axis in range(0, 3):
+        indices, axis_vertices = edge_vertices(field, axis, origin, step, iso_level,
+                                               sum(len(v) for v in vertices), function=function,
+                                               iterations=iterations)
+        edge_indices.append(indices)
+        vertices.append(axis_vertices)
+
+    faces = cell_faces(cube_indices(field, iso_level), edge_indices)
+    return numpy.concatenate(vertices), faces
+
+
+def marching_cubes_grid(field, origin, step, iso_level, function=None, iterations=0):
+    """
+    Compute the mesh triangles of a whole grid at once. Triangles are emitted in the same order
+    as calling marching_cubes on every cell with x as the outer loop and z as the inner one.
+    :param field: 3D array of the field values, indexed by [x, y, z]
+    :param origin: Position of the point field[0, 0, 0]
+    :param step: The step size of the grid
+    :param iso_level: The isovalue
+    :param function: Function computing the field values of an array of points, used to refine the vertices
+    :param iterations: Number of vertex refinement iterations
+    :return: Array of shape (n, 3, 3) with the three vertices of each triangle
+    """
+    vertices, faces = marching_cubes_mesh(field, origin, step, iso_level, function, iterations)
+    return vertices[faces]
+
+
+def marching_cubes_slabs(slices, origin, step, iso_level, function=None, iterations=0):
+    """
+    Compute the mesh of a grid one slab of cells at a time, a slab being the cells between two consecutive
+    z slices. Only two slices of the field are kept in memory.
+    :param slices: Iterable of the 2D arrays of field values of each z slice, indexed by [x, y]
+    :param origin: Position of the point [0, 0] of the first slice
+    :param step: The step size of the grid
+    :param iso_level: The isovalue
+    :param function: Function computing the field values of an array of points, used to refine the vertices
+    :param iterations: Number of vertex refinement iterations
+    :return: Generator of (vertices, faces) for each slab, vertices are the new ones of the slab and faces
+    index into all the vertices yielded so far
+    """
+    refine = {'function': function, 'iterations': iterations}
+    slices = iter(slices)
+    lower = numpy.asarray(next(slices), dtype=numpy.float64)[:, :, None]
+    vertex_count = 0
+
+    # Vertex index of the x and y edges of the lower slice
+    lower_indices = []
+    lower_vertices = []
+    for axis in range(0, 2):
+        indices, axis_vertices = edge_vertices(lower, axis, origin, step, iso_level, vertex_count, **refine)
+        lower_indices.append(indices)
+        lower_vertices.append(axis_vertices)
+        vertex_count += len(axis_vertices)
+
+    for k, upper in enumerate(slices):
+        upper = numpy.asarray(upper, dtype=numpy.float64)[:, :, None]
+        slab = numpy.concatenate((lower, upper), axis=2)
+
+        upper_indices = []
+        vertices = lower_vertices
+        for axis in range(0, 2):
+            indices, axis_vertices = edge_vertices(upper, axis, origin, step, iso_level, vertex_count,
+                                                   (0, 0, k + 1), **refine)
+            upper_indices.append(indices)
+            vertices.append(axis_vertices)
+            vertex_count += len(axis_vertices)
+
+        z_indices, z_vertices = edge_vertices(slab, 2, origin, step, iso_level, vertex_count, (0, 0, k), **refine)
+        vertices.append(z_vertices)
+        vertex_count += len(z_vertices)
+
+        edge_indices = [numpy.concatenate((lower_indices[0], upper_indices[0]), axis=2),
+                        numpy.concatenate((lower_indices[1], upper_indices[1]), axis=2),
+                        z_indices]
+        faces = cell_faces(cube_indices(slab, iso_level), edge_indices)
+
+        yield numpy.concatenate(vertices), faces
+
+        lower = upper
+        lower_indices = upper_indices
+        lower_vertices = []
+
+
+class _SampleCache:
+    """
+    Field values of the points of an integer lattice, evaluated on demand and kept sorted by key
+    """
+    def __init__(self, function, origin, step, size):
+        """
+        :param function: Function computing the field values of an array of points of shape (n, 3)
+        :param origin: Position of the lattice point (0, 0, 0)
+        :param step: Distance between two lattice points
+        :param size: Number of lattice steps along each axis
+        """
+        self.__function = function
+        self.__origin = numpy.asarray(origin, dtype=numpy.float64)
+        self.__step = step
+        self.__shape = numpy.asarray(size, dtype=numpy.int64) + 1
+        self.__keys = numpy.empty(0, dtype=numpy.int64)
+        self.__values = numpy.empty(0)
+
+    def keys(self, coordinates):
+        return (coordinates[..., 0] * self.__shape[1] + coordinates[..., 1]) * self.__shape[2] + coordinates[..., 2]
+
+    def __find(self, keys):
+        positions = numpy.minimum(numpy.searchsorted(self.__keys, keys), max(len(self.__keys) - 1, 0))
+        if len(self.__keys) == 0:
+            return positions, numpy.zeros(keys.shape, dtype=bool)
+        return positions, self.__keys[positions] == keys
+
+    def contains(self, coordinates):
+        return self.__find(self.keys(coordinates))[1]
+
+    def values(self, coordinates):
+        """
+        Get the field values of lattice points, evaluating the ones not known yet
+        :param coordinates: Integer array of shape (..., 3) of the lattice coordinates
+        :return: Array of shape (...) of the field values
+        """
+        keys = self.keys(coordinates)
+        positions, known = self.__find(keys)
+        if not numpy.all(known):
+            missing = numpy.unique(keys[~known])
+            z = missing % self.__shape[2]
+            y = missing // self.__shape[2] % self.__shape[1]
+            x = missing // (self.__shape[2] * self.__shape[1])
+            points = self.__origin + numpy.stack((x, y, z), axis=1) * self.__step
+            insert = numpy.searchsorted(self.__keys, missing)
+            self.__keys = numpy.insert(self.__keys, insert, missing)
+            self.__values = numpy.insert(self.__values, insert, self.__function(points))
+            positions = numpy.searchsorted(self.__keys, keys)
+        return self.__values[positions]
+
+
+def _split_cells(cells, size):
+    """
+    Compute the 8 children of cells
+    :param cells: Integer array of shape (n, 3) of the lower corner of the cells
+    :param size: Integer array of shape (n,) of the edge length of the cells
+    :return: The lower corner and size of the children
+    """
+    half = size // 2
+    children = cells[:, None, :] + corner_offsets[None, :, :] * half[:, None, None]
+    return children.reshape(-1, 3), numpy.repeat(half, 8)
+
+
+def _cell_stencils(cache, cells, size):
+    """
+    Get the field values of the 3x3x3 points of cells, i.e. the corners of their children
+    :return: Array of shape (n, 3, 3, 3)
+    """
+    stencil = numpy.stack(numpy.meshgrid(*[numpy.arange(3)] * 3, indexing='ij'), axis=-1).reshape(-1, 3)
+    points = cells[:, None, :] + stencil[None, :, :] * (size // 2)[:, None, None]
+    return cache.values(points).reshape(-1, 3, 3, 3)
+
+
+def _cell_edges(cells, size):
+    """
+    Compute the 12 edges of cells
+    :return: Integer arrays of the lower point, axis and length of each edge, of shape (n * 12, ...)
+    """
+    starts = cells[:, None, :] + corner_offsets[edge_corners[:, 0]][None, :, :] * size[:, None, None]
+    axes = numpy.argmax(corner_offsets[edge_corners[:, 1]] - corner_offsets[edge_corners[:, 0]], axis=1)
+    return starts.reshape(-1, 3), numpy.tile(axes, len(cells)), numpy.repeat(size, 12)
+
+
+def _edge_crossings(cache, starts, axes, lengths, iso_level):
+    """
+    Count the isosurface crossings along edges, using every known lattice point on them
+    :return: Array of the number of crossings of each edge
+    """
+    directions = numpy.eye(3, dtype=numpy.int64)
+    counts = numpy.zeros(len(starts), dtype=numpy.int64)
+    edges = numpy.arange(len(starts))
+    while len(edges):
+        ends = starts + directions[axes] * lengths[:, None]
+        middles = starts + directions[axes] * (lengths // 2)[:, None]
+        known = (lengths > 1) & cache.contains(middles)
+
+        crossed = (cache.values(starts[~known]) < iso_level) != (cache.values(ends[~known]) < iso_level)
+        counts += numpy.bincount(edges[~known], weights=crossed, minlength=len(counts)).astype(numpy.int64)
+
+        # Known middles split the edge in two halves
+        edges = numpy.concatenate((edges[known], edges[known]))
+        starts = numpy.concatenate((starts[known], middles[known]))
+        axes = numpy.concatenate((axes[known], axes[known]))
+        lengths = numpy.concatenate((lengths[known], lengths[known])) // 2
+    return counts
+
+
+def _finest_edges(cache, starts, axes, lengths, iso_level):
+    """
+    Find the smallest known part of crossed edges which is still crossed, so that cells of different sizes
+    sharing an edge share its vertex
+    :return: The lower point and length of the parts
+    """
+    directions = numpy.eye(3, dtype=numpy.int64)
+    starts = starts.copy()
+    lengths = lengths.copy()
+    todo = numpy.flatnonzero(lengths > 1)
+    while len(todo):
+        middles = starts[todo] + directions[axes[todo]] * (lengths[todo] // 2)[:, None]
+        known = cache.contains(middles)
+        todo = todo[known]
+        middles = middles[known]
+
+        # Keep the upper half when the lower one is not crossed
+        upper = (cache.values(starts[todo]) < iso_level) == (cache.values(middles) < iso_level)
+        starts[todo[upper]] = middles[upper]
+        lengths[todo] //= 2
+        todo = todo[lengths[todo] > 1]
+    return starts, lengths
+
+
+def _patch_cracks(faces, face_cells, cells, size, vertex_starts, vertex_axes, shape):
+    """
+    Close the cracks between cells of different sizes. The boundary edges of the mesh lying on a face shared by
+    a cell and smaller cells form closed loops in the face, which are filled with triangle fans.
+    :param faces: Array of shape (m, 3) of the triangles
+    :param face_cells: Array of the cell of each triangle
+    :param cells: Integer array of shape (n, 3) of the lower corner of the cells
+    :param size: Integer array of the edge length of the cells
+    :param vertex_starts: Integer array of shape (v, 3) of the lower point of the edge of each vertex
+    :param vertex_axes: Array of the axis of the edge of each vertex
+    :param shape: Number of lattice steps of the whole grid along each axis
+    :return: Array of shape (p, 3) of the patch triangles
+    """
+    vertex_count = len(vertex_starts)
+    edges = faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2)
+    edge_cells = numpy.repeat(face_cells, 3)
+    codes = edges[:, 0] * vertex_count + edges[:, 1]
+    boundary = ~numpy.isin(codes, edges[:, 1] * vertex_count + edges[:, 0])
+    edges = edges[boundary]
+    edge_cells = edge_cells[boundary]
+
+    # Plane holding each boundary edge, outside of the grid faces
+    u, v = edges[:, 0], edges[:, 1]
+    plane_axes = numpy.full(len(edges), -1)
+    for axis in range(2, -1, -1):
+        on_plane = (vertex_axes[u] != axis) & (vertex_axes[v] != axis) & \
+                   (vertex_starts[u, axis] == vertex_starts[v, axis])
+        plane_axes[on_plane] = axis
+    keep = plane_axes >= 0
+    edges, edge_cells, plane_axes = edges[keep], edge_cells[keep], plane_axes[keep]
+    planes = vertex_starts[edges[:, 0], plane_axes]
+    keep = (planes > 0) & (planes < numpy.asarray(shape)[plane_axes])
+    edges, edge_cells, plane_axes, planes = edges[keep], edge_cells[keep], plane_axes[keep], planes[keep]
+
+    # Cell on the other side of the plane, at least as large as the cell of the edge
+    directions = numpy.eye(3, dtype=numpy.int64)
+    sides = numpy.where(cells[edge_cells, plane_axes] == planes, -1, 1)
+    across = cells[edge_cells] + directions[plane_axes] * (sides * size[edge_cells])[:, None]
+    cell_keys = _cell_keys(cells, size, shape)
+    order = numpy.argsort(cell_keys)
+    neighbours = numpy.full(len(edges), -1)
+    length = size[edge_cells]
+    candidate_size = numpy.full(len(edges), numpy.max(size))
+    while True:
+        searched = (neighbours == -1) & (candidate_size >= length)
+        if not numpy.any(searched):
+            break
+        aligned = across[searched] // candidate_size[searched, None] * candidate_size[searched, None]
+        keys = _cell_keys(aligned, candidate_size[searched], shape)
+        positions = numpy.minimum(numpy.searchsorted(cell_keys, keys, sorter=order), len(order) - 1)
+        found = cell_keys[order[positions]] == keys
+        neighbours[numpy.flatnonzero(searched)[found]] = order[positions[found]]
+        candidate_size[searched] //= 2
+
+    # Each crack belongs to the face of the larger cell
+    coarse = numpy.where(neighbours == -1, edge_cells,
+                         numpy.where(size[numpy.maximum(neighbours, 0)] > length, neighbours,
+                                     numpy.minimum(edge_cells, neighbours)))
+    groups = numpy.stack((coarse, plane_axes, planes), axis=1)
+    group_keys, group_index = numpy.unique(groups, axis=0, return_inverse=True)
+    group_index = group_index.reshape(-1)
+
+    patches = []
+    for group in numpy.split(numpy.argsort(group_index, kind='stable'),
+                             numpy.cumsum(numpy.bincount(group_index, minlength=len(group_keys)))[:-1]):
+        # The patch goes along the boundary edges backwards
+        following = {}
+        for start, end in edges[group][:, ::-1]:
+            following.setdefault(int(start), []).append(int(end))
+
+        while following:
+            loop = [next(iter(following))]
+            positions = {loop[0]: 0}
+            while loop[-1] in following:
+                ends = following[loop[-1]]
+                current = ends.pop()
+                if not ends:
+                    del following[loop[-1]]
+                if current in positions:
+                    # Closed loop, the remaining vertices may start another one
+                    cycle = loop[positions[current]:]
+                    for vertex in cycle[1:]:
+                        del positions[vertex]
+                    del loop[positions[current] + 1:]
+                    patches.extend((cycle[0], cycle[i], cycle[i + 1]) for i in range(1, len(cycle) - 1))
+                else:
+                    positions[current] = len(loop)
+                    loop.append(current)
+
+    return numpy.array(patches, dtype=numpy.int64).reshape(-1, 3)
+
+
+def _cell_keys(cells, size, shape):
+    """
+    Compute a unique key for cells from their lower corner and size
+    """
+    shape = numpy.asarray(shape, dtype=numpy.int64) + 1
+    corner_keys = (cells[:, 0] * shape[1] + cells[:, 1]) * shape[2] + cells[:, 2]
+    return corner_keys * (int(numpy.log2(numpy.max(shape))) + 2) + numpy.log2(size).astype(numpy.int64)
+
+
+def adaptive_marching_cubes(function, origin, step, roots, levels, iso_level, tolerance, margin=None,
+                            iterations=0):
+    """
+    Compute the mesh of an octree of cells. Root cells are split while the isosurface goes through them
+    and the trilinear interpolation of their corner values is too far from the field, down to the step size.
+    Cells sharing an edge share its vertex, and the cracks between cells of different sizes are closed.
+    :param function: Function computing the field values of an array of points of shape (n, 3)
+    :param origin: Position of the lower corner of the grid
+    :param step: The size of the smallest cells
+    :param roots: Number of root cells along each axis
+    :param levels: Number of times a root cell can be split
+    :param iso_level: The isovalue
+    :param tolerance: The largest distance allowed between the mesh and the isosurface, estimated in each cell
+    :param margin: Function of the cell size and corner values range giving how far from the corner values
+    the isovalue can be for a cell to be tested, the half of the range by default
+    :param iterations: Number of vertex refinement iterations
+    :return: Array of shape (n, 3) of the vertices and array of shape (m, 3) of the triangles vertex indices
+    """
+    shape = numpy.asarray(roots, dtype=numpy.int64) * 2 ** levels
+    cache = _SampleCache(function, origin, step, shape)
+    if margin is None:
+        def margin(cell_size, value_range):
+            return value_range * 0.5
+
+    cells = numpy.stack(numpy.meshgrid(*[numpy.arange(r) for r in roots], indexing='ij'), axis=-1).reshape(-1, 3)
+    cells = cells * 2 ** levels
+    size = numpy.full(len(cells), 2 ** levels)
+    leaves = []
+    leaves_size = []
+    for level in range(0, levels + 1):
+        corners = cache.values(cells[:, None, :] + corner_offsets[None, :, :] * size[:, None, None])
+        split = numpy.zeros(len(cells), dtype=bool)
+        if level < levels:
+            lower = numpy.fmin.reduce(corners, axis=1)
+            upper = numpy.fmax.reduce(corners, axis=1)
+            cell_margin = margin(size * step, upper - lower)
+            tested = numpy.flatnonzero(((lower - cell_margin <= iso_level) & (upper + cell_margin >= iso_level)) |
+                                       numpy.any(numpy.isnan(corners), axis=1))
+
+            stencils = _cell_stencils(cache, cells[tested], size[tested])
+            below = (stencils < iso_level).reshape(-1, 27)
+            crossed = numpy.any(below, axis=1) & ~numpy.all(below, axis=1)
+            corner_below = below[:, [0, 2, 6, 8, 18, 20, 24, 26]]
+            hidden = crossed & (numpy.all(corner_below, axis=1) | ~numpy.any(corner_below, axis=1))
+
+            # Trilinear interpolation of the corner values on the stencil points
+            linear = stencils[:, ::2, ::2, ::2]
+            for axis in range(1, 4):
+                lower_half = numpy.take(linear, [0], axis=axis)
+                upper_half = numpy.take(linear, [1], axis=axis)
+                linear = numpy.concatenate((lower_half, (lower_half + upper_half) / 2, upper_half), axis=axis)
+            gradient = numpy.stack([numpy.mean(numpy.take(linear, [2], axis=axis) - numpy.take(linear, [0], axis=axis),
+                                               axis=(1, 2, 3)) for axis in range(1, 4)], axis=1)
+            gradient = numpy.linalg.norm(gradient, axis=1) / (size[tested] * step)
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                error = numpy.fmax.reduce(numpy.abs(stencils - linear).reshape(-1, 27), axis=1) / gradient
+            split[tested] = crossed & ((error > tolerance) | hidden | numpy.isnan(error))
+
+        leaves.append(cells[~split])
+        leaves_size.append(size[~split])
+        cells, size = _split_cells(cells[split], size[split])
+
+    cells = numpy.concatenate(leaves)
+    size = numpy.concatenate(leaves_size)
+
+    # Split the cells whose edges are crossed several times by the vertices of smaller neighbours
+    while True:
+        corners = cache.values(cells[:, None, :] + corner_offsets[None, :, :] * size[:, None, None])
+        below = corners[:, edge_corners[:, 0]] < iso_level
+        expected = below != (corners[:, edge_corners[:, 1]] < iso_level)
+
+        # Only the edges with a known middle can be crossed more than their ends tell
+        starts, axes, lengths = _cell_edges(cells, size)
+        middles = starts + numpy.eye(3, dtype=numpy.int64)[axes] * (lengths // 2)[:, None]
+        checked = numpy.flatnonzero((lengths > 1) & cache.contains(middles))
+        crossings = expected.reshape(-1).astype(numpy.int64)
+        crossings[checked] = _edge_crossings(cache, starts[checked], axes[checked], lengths[checked], iso_level)
+        split = numpy.any(crossings.reshape(-1, 12) > expected, axis=1)
+        if not numpy.any(split):
+            break
+        children, children_size = _split_cells(cells[split], size[split])
+        _cell_stencils(cache, cells[split], size[split])
+        cells = numpy.concatenate((cells[~split], children))
+        size = numpy.concatenate((size[~split], children_size))
+
+    # One vertex per crossed edge, placed on its smallest known crossed part
+    cube_index = numpy.zeros(len(cells), dtype=numpy.uint8)
+    for corner in range(0, 8):
+        cube_index |= (corners[:, corner] < iso_level).astype(numpy.uint8) << numpy.uint8(corner)
+    surface = numpy.flatnonzero(edge_table_array[cube_index])
+    starts, axes, lengths = _cell_edges(cells[surface], size[surface])
+    crossed = expected[surface].reshape(-1)
+    starts, lengths = _finest_edges(cache, starts[crossed], axes[crossed], lengths[crossed], iso_level)
+    edge_keys = cache.keys(starts) * 3 + axes[crossed]
+    unique_keys, first, vertex_index = numpy.unique(edge_keys, return_index=True, return_inverse=True)
+    vert_list = numpy.full(len(surface) * 12, -1, dtype=numpy.int64)
+    vert_list[crossed] = vertex_index.reshape(-1)
+
+    directions = numpy.eye(3, dtype=numpy.int64)
+    vertex_starts = starts[first]
+    vertex_axes = axes[crossed][first]
+    vertex_ends = vertex_starts + directions[vertex_axes] * lengths[first][:, None]
+    origin = numpy.asarray(origin, dtype=numpy.float64)
+    if iterations > 0:
+        vertices = refine_roots(function, iso_level, origin + vertex_starts * step, origin + vertex_ends * step,
+                                cache.values(vertex_starts), cache.values(vertex_ends), iterations)
+    else:
+        vertices = linear_vertices_interpolation(iso_level, origin + vertex_starts * step,
+                                                 origin + vertex_ends * step,
+                                                 cache.values(vertex_starts), cache.values(vertex_ends))
+
+    faces, face_cells = table_faces(cube_index[surface], vert_list.reshape(-1, 12))
+    patches = _patch_cracks(faces, surface[face_cells], cells, size, vertex_starts, vertex_axes, shape)
+    return vertices, numpy.concatenate((faces, patches))
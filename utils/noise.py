@@ -0,0 +1,160 @@
+import numpy
+
+# Based on the improved noise of Ken Perlin https://mrl.cs.nyu.edu/~perlin/noise/
+# Permutation table
+permutation = numpy.array([
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225,
+    140, 36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148,
+    247, 120, 234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32,
+    57, 177, 33, 88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175,
+    74, 165, 71, 134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122,
+    60, 211, 133, 230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54,
+    65, 25, 63, 161, 1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169,
+    200, 196, 135, 130, 116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64,
+    52, 217, 226, 250, 124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212,
+    207, 206, 59, 227, 47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213,
+    119, 248, 152, 2, 44, 154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9,
+    129, 22, 39, 253, 19, 98, 108, 110, 79, 113, 224, 232, 178, 185, 112, 104,
+    218, 246, 97, 228, 251, 34, 242, 193, 238, 210, 144, 12, 191, 179, 162, 241,
+    81, 51, 145, 235, 249, 14, 239, 107, 49, 192, 214, 31, 181, 199, 106, 157,
+    184, 84, 204, 176, 115, 121, 50, 45, 127, 4, 150, 254, 138, 236, 205, 93,
+    222, 114, 67, 29, 24, 72, 243, 141, 128, 195, 78, 66, 215, 61, 156, 180
+] * 2, dtype=numpy.int64)
+
+
+def fade(t):
+    """
+    Smooth the interpolation factor
+    :param t: Array of interpolation factors
+    :return: Smoothed factors
+    """
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def lerp(t, a, b):
+    return a + t * (b - a)
+
+
+def grad(hash_value, x, y, z):
+    """
+    Compute the dot product between the position and the gradient selected by the hash
+    :param hash_value: Array of hash values
+    :param x: Array of x position in the cell
+    :param y: Array of y position in the cell
+    :param z: Array of z position in the cell
+    :return: Array of dot products
+    """
+    h = hash_value & 15
+    u = numpy.where(h < 8, x, y)
+    v = numpy.where(h < 4, y, numpy.where((h == 12) | (h == 14), x, z))
+    return numpy.where(h & 1 == 0, u, -u) + numpy.where(h & 2 == 0, v, -v)
+
+
+def perlin_noise(points):
+    """
+    Compute the signed Perlin noise of several points
+    :param points: Array of shape (n, 3) of the points
+    :return: Array of shape (n,) of the noise values, between -1 and 1
+    """
+    points = numpy.asarray(points, dtype=numpy.float64)
+    cells = numpy.floor(points)
+    x, y, z = (points - cells).T
+    cx, cy, cz = (cells.astype(numpy.int64) & 255).T
+
+    u = fade(x)
+    v = fade(y)
+    w = fade(z)
+
+    # Hash the 8 corners of the cells
+    a = permutation[cx] + cy
+    aa = permutation[a] + cz
+    ab = permutation[a + 1] + cz
+    b = permutation[cx + 1] + cy
+    ba = permutation[b] + cz
+    bb = permutation[b + 1] + cz
+
+    return lerp(w, lerp(v, lerp(u, grad(permutation[aa], x, y, z),
+                                   grad(permutation[ba], x - 1, y, z)),
+                           lerp(u, grad(permutation[ab], x, y - 1, z),
+                                grad(permutation[bb], x - 1, y - 1, z))),
+                lerp(v, lerp(u, grad(permutation[aa + 1], x, y, z - 1),
+                             grad(permutation[ba + 1], x - 1, y, z - 1)),
+                     lerp(u, grad(permutation[ab + 1], x, y - 1, z - 1),
+                          grad(permutation[bb + 1], x - 1, y - 1, z - 1))))
+
+
+def noise(points):
+    """
+    Compute the unsigned Perlin noise of several points
+    :param points: Array of shape (n, 3) of the points
+    :return: Array of shape (n,) of the noise values, between 0 and 1
+    """
+    return 0.5 + 0.5 * perlin_noise(points)
+
+
+def hybrid_multi_fractal(points, h, lacunarity, octaves, offset, gain):
+    """
+    Compute the hybrid multifractal of several points, as mathutils.noise.hybrid_multi_fractal does
+    :param points: Array of shape (n, 3) of the points
+    :param h: The fractal increment factor
+    :param lacunarity: The gap between successive frequencies
+    :param octaves: The number of different noise frequencies used
+    :param offset: The height of the terrain above sea level
+    :param gain: Scaling applied to the values
+    :return: Array of shape (n,) of the fractal values
+    """
+    points = numpy.asarray(points, dtype=numpy.float64)
+    pw_hl = lacunarity ** -h
+    pwr = numpy.full(len(points), pw_hl)
+
+    result = perlin_noise(points) + offset
+    weight = gain * result
+    points = points * lacunarity
+
+    # Each point stops adding octaves once its weight is too small
+    i = 1
+    active = weight > 0.001
+    while i < int(octaves) and numpy.any(active):
+        weight[active] = numpy.minimum(weight[active], 1.)
+        signal = (perlin_noise(points[active]) + offset) * pwr[active]
+        pwr[active] *= pw_hl
+        result[active] += weight[active] * signal
+        weight[active] *= gain * signal
+        points[active] *= lacunarity
+        active &= weight > 0.001
+        i += 1
+
+    remainder = octaves - int(octaves)
+    if remainder != 0.:
+        result += remainder * ((perlin_noise(points) + offset) * pwr)
+
+    return result
+
+
+def fractal_noise(points, detail, roughness):
+    """
+    Compute the fractal noise of several points, as the Blender noise texture does
+    :param points: Array of shape (n, 3) of the points
+    :param detail: The number of octaves added to the first one, its fractional part blends the last octave
+    :param roughness: The amplitude factor between successive octaves
+    :return: Array of shape (n,) of the fractal values, between 0 and 1
+    """
+    points = numpy.asarray(points, dtype=numpy.float64)
+    octaves = min(max(detail, 0.), 15.)
+
+    scale = 1.
+    amplitude = 1.
+    max_amplitude = 0.
+    result = numpy.zeros(len(points))
+    for i in range(0, int(octaves) + 1):
+        result += noise(points * scale) * amplitude
+        max_amplitude += amplitude
+        amplitude *= roughness
+        scale *= 2.
+
+    remainder = octaves - int(octaves)
+    if remainder != 0.:
+        blended = (result + noise(points * scale) * amplitude) / (max_amplitude + amplitude)
+        return (1. - remainder) * result / max_amplitude + remainder * blended
+
+    return result / max_amplitude